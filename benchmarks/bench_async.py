@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Concurrent load benchmark for the async tool handlers against fake_iris.
+
+Fires N concurrent mixed tool calls (cheap global reads, command execution
+and slow package compiles) through the in-process FastMCP client and reports
+p50/p99 latency per tool, showing that slow compiles do not starve reads.
+
+    python benchmarks/bench_async.py --calls 200 --concurrency 32 --compile-ms 2000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_iris
+import iris_execute_mcp as server
+from fastmcp import Client
+from bench_pool import percentile
+
+server.iris = fake_iris
+server.IRIS_AVAILABLE = True
+logging.getLogger("iris_execute_mcp").setLevel(logging.WARNING)
+
+# Tool mix: (tool name, arguments, relative weight)
+TOOL_MIX = [
+    ("get_global", {"global_ref": "^Bench(1)"}, 10),
+    ("set_global", {"global_ref": "^Bench(1)", "value": "x"}, 4),
+    ("get_system_info", {}, 2),
+    ("execute_command", {"command": "SET x=1"}, 4),
+    ("compile_objectscript_package", {"package_name": "Bench.Pkg"}, 1),
+]
+
+
+def build_workload(calls: int):
+    """Deterministic interleaving of the tool mix."""
+    weighted = [(name, args) for name, args, weight in TOOL_MIX for _ in range(weight)]
+    return [weighted[i % len(weighted)] for i in range(calls)]
+
+
+async def run(calls: int, concurrency: int) -> dict:
+    """Drive the workload with at most `concurrency` calls in flight."""
+    latencies = {}
+    gate = asyncio.Semaphore(concurrency)
+
+    async with Client(server.mcp) as client:
+        async def one_call(name, args):
+            async with gate:
+                start = time.perf_counter()
+                await client.call_tool(name, args)
+                latencies.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(one_call(name, args) for name, args in build_workload(calls)))
+        wall = time.perf_counter() - wall_start
+
+    return {"wall": wall, "latencies": latencies}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--call-ms", type=float, default=5.0, help="simulated cost of cheap calls")
+    parser.add_argument("--compile-ms", type=float, default=2000.0, help="simulated cost of a package compile")
+    args = parser.parse_args()
+
+    fake_iris.configure(
+        connect_latency=0.02,
+        call_latency=args.call_ms / 1000,
+        method_latency={"ExecuteMCP.Core.Compile.CompilePackage": args.compile_ms / 1000},
+    )
+
+    result = asyncio.run(run(args.calls, args.concurrency))
+
+    print(f"{args.calls} calls, concurrency {args.concurrency}, wall {result['wall']:.2f}s "
+          f"({args.calls / result['wall']:.1f} ops/s)")
+    print(f"budgets: {server.CONCURRENCY_LIMITS}")
+    print(f"{'tool':<30} {'calls':>6} {'p50 ms':>10} {'p99 ms':>10}")
+    for name, samples in sorted(result["latencies"].items()):
+        print(f"{name:<30} {len(samples):>6} {percentile(samples, 50):>10.1f} {percentile(samples, 99):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
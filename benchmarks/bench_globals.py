@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Native API vs ObjectScript path benchmark for get_global / set_global against fake_iris.
+
+Runs the same sequence of global reads and writes through the in-process FastMCP
+client twice - once with the Native API fast path (IRIS_NATIVE_GLOBALS=true) and
+once forced through ExecuteMCP.Core.Command.GetGlobal / SetGlobal - and reports
+p50/p99 latency and throughput per path.
+
+The stand-in charges --rtt-ms for every server round-trip and --method-ms on top
+for the server-side work of the ObjectScript methods (namespace switch, privilege
+check, indirection, JSON build); measure both on a real instance and pass them in.
+
+    python benchmarks/bench_globals.py --calls 500 --rtt-ms 0.2 --method-ms 0.5
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_iris
+import iris_execute_mcp as server
+from fastmcp import Client
+from bench_pool import percentile
+
+server.iris = fake_iris
+server.IRIS_AVAILABLE = True
+logging.getLogger("iris_execute_mcp").setLevel(logging.WARNING)
+
+
+def build_workload(calls: int):
+    """Alternating writes and reads over a small set of subscripted nodes."""
+    workload = []
+    for i in range(calls):
+        ref = f'^Bench({i % 10},"node")'
+        if i % 4 == 0:
+            workload.append(("set_global", {"global_ref": ref, "value": f"v{i}"}))
+        else:
+            workload.append(("get_global", {"global_ref": ref}))
+    return workload
+
+
+async def run(calls: int, concurrency: int) -> dict:
+    """Drive the workload with at most `concurrency` calls in flight."""
+    latencies = {}
+    gate = asyncio.Semaphore(concurrency)
+
+    async with Client(server.mcp) as client:
+        async def one_call(name, args):
+            async with gate:
+                start = time.perf_counter()
+                await client.call_tool(name, args)
+                latencies.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+        # Warm the pool and the privilege check outside the measurement
+        await client.call_tool("get_global", {"global_ref": "^Bench"})
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(one_call(name, args) for name, args in build_workload(calls)))
+        wall = time.perf_counter() - wall_start
+
+    return {"wall": wall, "latencies": latencies}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--rtt-ms", type=float, default=0.2, help="simulated cost of one server round-trip")
+    parser.add_argument("--method-ms", type=float, default=0.5,
+                        help="simulated server-side cost of GetGlobal / SetGlobal on top of the round-trip")
+    args = parser.parse_args()
+
+    rtt = args.rtt_ms / 1000
+    objectscript = rtt + args.method_ms / 1000
+    fake_iris.configure(
+        connect_latency=0.02,
+        call_latency=rtt,
+        native_latency=rtt,
+        method_latency={
+            "ExecuteMCP.Core.Command.GetGlobal": objectscript,
+            "ExecuteMCP.Core.Command.SetGlobal": objectscript,
+        },
+    )
+
+    print(f"{args.calls} calls, concurrency {args.concurrency}, "
+          f"round-trip {args.rtt_ms}ms, ObjectScript method {args.method_ms}ms")
+    print(f"{'path':<14} {'tool':<12} {'calls':>6} {'p50 ms':>10} {'p99 ms':>10}")
+    for path, enabled in (("objectscript", False), ("native", True)):
+        server.NATIVE_GLOBALS = enabled
+        fake_iris.reset_stats()
+        result = asyncio.run(run(args.calls, args.concurrency))
+        for name, samples in sorted(result["latencies"].items()):
+            print(f"{path:<14} {name:<12} {len(samples):>6} {percentile(samples, 50):>10.2f} "
+                  f"{percentile(samples, 99):>10.2f}")
+        print(f"{'':<14} {args.calls / result['wall']:.1f} ops/s, {fake_iris.stats['calls']} method calls, "
+              f"{fake_iris.stats['globalOps']} global ops")
+
+
+if __name__ == "__main__":
+    main()
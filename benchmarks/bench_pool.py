@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Connection pool benchmark against the fake_iris stand-in.
+
+Runs the same number of call_iris_sync() calls with pooling disabled
+(one connect per call) and enabled, and reports latency and pool metrics.
+
+    python benchmarks/bench_pool.py --calls 200 --threads 4 --connect-ms 20
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_iris
+import iris_execute_mcp as server
+
+server.iris = fake_iris
+server.IRIS_AVAILABLE = True
+logging.getLogger("iris_execute_mcp").setLevel(logging.WARNING)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run(calls: int, threads: int, pooled: bool) -> dict:
+    """Drive `calls` GetGlobal calls across `threads` workers and collect latencies."""
+    server.close_connection_pools()
+    server.POOL_ENABLED = pooled
+    fake_iris.reset_stats()
+
+    def one_call(i):
+        start = time.perf_counter()
+        server.call_iris_sync("ExecuteMCP.Core.Command", "GetGlobal", f"^Bench({i})", "HSCUSTOM")
+        return (time.perf_counter() - start) * 1000
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one_call, range(calls)))
+    wall = time.perf_counter() - wall_start
+
+    result = {
+        "mode": "pooled" if pooled else "unpooled",
+        "calls": calls,
+        "opsPerSec": calls / wall,
+        "meanMs": statistics.mean(latencies),
+        "p50Ms": percentile(latencies, 50),
+        "p99Ms": percentile(latencies, 99),
+        "connects": fake_iris.stats["connects"],
+    }
+    if pooled:
+        result["pool"] = server.get_connection_pool().stats()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--connect-ms", type=float, default=20.0, help="simulated connect + auth cost")
+    parser.add_argument("--call-ms", type=float, default=1.0, help="simulated server call cost")
+    args = parser.parse_args()
+
+    fake_iris.configure(connect_latency=args.connect_ms / 1000, call_latency=args.call_ms / 1000)
+
+    print(f"{'mode':<10} {'ops/s':>10} {'mean ms':>10} {'p50 ms':>10} {'p99 ms':>10} {'connects':>10}")
+    for pooled in (False, True):
+        r = run(args.calls, args.threads, pooled)
+        print(f"{r['mode']:<10} {r['opsPerSec']:>10.1f} {r['meanMs']:>10.2f} {r['p50Ms']:>10.2f} "
+              f"{r['p99Ms']:>10.2f} {r['connects']:>10}")
+        if pooled:
+            print("pool metrics:", {k: r["pool"][k] for k in
+                                    ("checkouts", "waits", "creates", "evictions", "discards", "reconnects")})
+
+
+if __name__ == "__main__":
+    main()
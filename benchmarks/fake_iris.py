@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the intersystems-irispython `iris` module.
+
+Simulates connection setup cost and per-call latency so the MCP server can be
+exercised and measured offline. Inject it with:
+
+    import fake_iris
+    import iris_execute_mcp
+    iris_execute_mcp.iris = fake_iris
+    iris_execute_mcp.IRIS_AVAILABLE = True
+"""
+
+import json
+import random
+import threading
+import time
+
+# Simulated costs in seconds (override with configure())
+CONNECT_LATENCY = 0.020
+CALL_LATENCY = 0.001
+METHOD_LATENCY = {}
+NATIVE_LATENCY = None  # per global get/set/isDefined/kill; None uses CALL_LATENCY
+SQL_ROWS = 1000  # rows returned by any simulated SELECT
+PAYLOAD_BYTES = {}  # "Class.Method" (or "*") -> characters of output added to the response
+ERROR_RATE = 0.0  # fraction of ExecuteMCP calls answered with "status": "error"
+DISCONNECT_RATE = 0.0  # fraction of calls and global operations that drop the connection
+_random = random.Random(0)
+
+_lock = threading.Lock()
+_next_job = 1000
+_jobs = {}
+_globals = {}  # (namespace, name) -> {subscripts tuple: value}
+stats = {"connects": 0, "closes": 0, "calls": 0, "terminates": 0, "globalOps": 0,
+         "injectedErrors": 0, "injectedDisconnects": 0}
+
+
+def configure(connect_latency: float = None, call_latency: float = None, method_latency: dict = None,
+              native_latency: float = None, sql_rows: int = None, payload_bytes=None,
+              error_rate: float = None, disconnect_rate: float = None, seed: int = None):
+    """
+    Change simulated latencies; method_latency maps "Class.Method" to seconds and
+    native_latency is the cost of one Native API global operation. sql_rows sets the
+    size of the result of every simulated SELECT.
+
+    payload_bytes pads the output of ExecuteMCP responses: an int for every method or a
+    dict keyed by "Class.Method" (with "*" as the default). error_rate and disconnect_rate
+    inject IRIS-side errors and broken connections at random, reproducibly for a seed.
+    """
+    global CONNECT_LATENCY, CALL_LATENCY, METHOD_LATENCY, NATIVE_LATENCY, SQL_ROWS
+    global PAYLOAD_BYTES, ERROR_RATE, DISCONNECT_RATE
+    if connect_latency is not None:
+        CONNECT_LATENCY = connect_latency
+    if call_latency is not None:
+        CALL_LATENCY = call_latency
+    if method_latency is not None:
+        METHOD_LATENCY = dict(method_latency)
+    if native_latency is not None:
+        NATIVE_LATENCY = native_latency
+    if sql_rows is not None:
+        SQL_ROWS = sql_rows
+    if payload_bytes is not None:
+        PAYLOAD_BYTES = dict(payload_bytes) if isinstance(payload_bytes, dict) else {"*": payload_bytes}
+    if error_rate is not None:
+        ERROR_RATE = error_rate
+    if disconnect_rate is not None:
+        DISCONNECT_RATE = disconnect_rate
+    if seed is not None:
+        _random.seed(seed)
+
+
+def _chance(rate: float) -> bool:
+    if rate <= 0:
+        return False
+    with _lock:
+        return _random.random() < rate
+
+
+def reset_stats():
+    """Zero the connect/close/call counters."""
+    with _lock:
+        for key in stats:
+            stats[key] = 0
+
+
+def _count(key: str):
+    with _lock:
+        stats[key] += 1
+
+
+class FakeConnection:
+    """Simulated Native API connection bound to one server process."""
+
+    def __init__(self, hostname, port, namespace, username, password):
+        global _next_job
+        self.hostname = hostname
+        self.port = port
+        self.namespace = namespace
+        self.username = username
+        self._closed = False
+        self.terminated = False
+        # ExecuteMCP.Core.SQL cursors live in the server process: cursor ID -> next row
+        self.sql_cursors = {}
+        with _lock:
+            _next_job += 1
+            self.job = _next_job
+            _jobs[self.job] = self
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            _count("closes")
+            with _lock:
+                _jobs.pop(self.job, None)
+
+    def isClosed(self):
+        return self._closed or self.terminated
+
+
+class FakeIRIS:
+    """Simulated IRIS object answering the ExecuteMCP class methods."""
+
+    def __init__(self, conn: FakeConnection):
+        self._conn = conn
+
+    def _sleep(self, seconds):
+        """Sleep in slices so a terminated server process aborts the call."""
+        end = time.monotonic() + seconds
+        while True:
+            if self._conn.isClosed():
+                raise ConnectionError("connection closed by server")
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 0.01))
+
+    def _maybe_disconnect(self):
+        """Drop the connection at DISCONNECT_RATE, like a server restart or network failure."""
+        if _chance(DISCONNECT_RATE):
+            _count("injectedDisconnects")
+            self._conn.close()
+            raise ConnectionError("connection reset by server")
+
+    def _call(self, class_name, method_name, args):
+        if self._conn.isClosed():
+            raise ConnectionError("connection closed")
+        _count("calls")
+        self._sleep(METHOD_LATENCY.get(f"{class_name}.{method_name}", CALL_LATENCY))
+        if not class_name.startswith("%"):
+            self._maybe_disconnect()
+            if _chance(ERROR_RATE):
+                _count("injectedErrors")
+                return json.dumps({"status": "error", "errorMessage": "Injected failure",
+                                   "className": class_name, "methodName": method_name})
+
+        if (class_name, method_name) == ("%SYSTEM.SYS", "ProcessID"):
+            return self._conn.job
+        if (class_name, method_name) == ("%SYSTEM.Security", "Check"):
+            return 1
+        if (class_name, method_name) == ("%SYSTEM.Process", "Terminate"):
+            with _lock:
+                target = _jobs.get(args[0])
+            if target is None:
+                return 0
+            target.terminated = True
+            _count("terminates")
+            return 1
+        if (class_name, method_name) == ("ExecuteMCP.Core.Command", "ResetProcess"):
+            return 0
+        if class_name == "ExecuteMCP.Core.SQL":
+            return json.dumps(self._sql(method_name, args))
+        payload = PAYLOAD_BYTES.get(f"{class_name}.{method_name}", PAYLOAD_BYTES.get("*", 0))
+        return json.dumps({
+            "status": "success",
+            "className": class_name,
+            "methodName": method_name,
+            "namespace": args[-1] if args else self._conn.namespace,
+            "output": "x" * payload,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+
+    def _sql_page(self, cursor_id, start, page_size):
+        """Rows start.. of the simulated result; keeps the cursor open while rows remain."""
+        end = min(start + page_size, SQL_ROWS)
+        rows = [[i, f"name{i}"] for i in range(start, end)]
+        response = {"status": "success", "rows": rows, "rowCount": len(rows), "rowsFetched": end,
+                    "hasMore": end < SQL_ROWS}
+        if end < SQL_ROWS and cursor_id:
+            self._conn.sql_cursors[cursor_id] = end
+            response["cursorId"] = cursor_id
+        else:
+            self._conn.sql_cursors.pop(cursor_id, None)
+        return response
+
+    def _sql(self, method_name, args):
+        """Simulate ExecuteMCP.Core.SQL Execute / Fetch / Close."""
+        if method_name == "Execute":
+            sql, _, namespace, page_size, cursor_id = args[:5]
+            if not sql.lstrip().lower().startswith("select"):
+                return {"status": "success", "rowCount": 1, "hasMore": False, "namespace": namespace}
+            response = {"status": "success", "columns": ["ID", "Name"]}
+            response.update(self._sql_page(cursor_id, 0, page_size))
+            response["namespace"] = namespace
+            return response
+        if method_name == "Fetch":
+            cursor_id, page_size = args
+            if cursor_id not in self._conn.sql_cursors:
+                return {"status": "error", "errorMessage": f"Unknown or expired cursor: {cursor_id}"}
+            return self._sql_page(cursor_id, self._conn.sql_cursors[cursor_id], page_size)
+        closed = self._conn.sql_cursors.pop(args[0], None) is not None
+        return {"status": "success", "closed": closed, "cursorId": args[0]}
+
+    def classMethodString(self, class_name, method_name, *args):
+        return str(self._call(class_name, method_name, args))
+
+    def classMethodValue(self, class_name, method_name, *args):
+        return self._call(class_name, method_name, args)
+
+    # Native API global operations on an in-memory store per namespace
+
+    def _nodes(self, name):
+        if self._conn.isClosed():
+            raise ConnectionError("connection closed")
+        _count("globalOps")
+        self._sleep(CALL_LATENCY if NATIVE_LATENCY is None else NATIVE_LATENCY)
+        self._maybe_disconnect()
+        with _lock:
+            return _globals.setdefault((self._conn.namespace, name), {})
+
+    def get(self, name, *subscripts):
+        nodes = self._nodes(name)
+        with _lock:
+            return nodes.get(tuple(subscripts))
+
+    def set(self, value, name, *subscripts):
+        nodes = self._nodes(name)
+        with _lock:
+            nodes[tuple(subscripts)] = value
+
+    def isDefined(self, name, *subscripts):
+        nodes = self._nodes(name)
+        key = tuple(subscripts)
+        with _lock:
+            has_value = key in nodes
+            has_children = any(len(k) > len(key) and k[:len(key)] == key for k in nodes)
+        return (1 if has_value else 0) + (10 if has_children else 0)
+
+    def kill(self, name, *subscripts):
+        nodes = self._nodes(name)
+        key = tuple(subscripts)
+        with _lock:
+            for k in [k for k in nodes if k[:len(key)] == key]:
+                del nodes[k]
+
+
+def connect(hostname, port, namespace, username, password):
+    time.sleep(CONNECT_LATENCY)
+    _count("connects")
+    return FakeConnection(hostname, port, namespace, username, password)
+
+
+def createIRIS(conn):
+    return FakeIRIS(conn)
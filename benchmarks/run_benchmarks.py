@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for every MCP tool against fake_iris.
+
+Each tool registered on the server is driven on its own through the in-process
+FastMCP client, once per concurrency level, and the suite writes a JSON report
+with ops/sec, p50/p95/p99 latency, error counts and memory per tool and level,
+tagged with the git commit so reports can be compared across commits:
+
+    python benchmarks/run_benchmarks.py --output bench-report.json
+    python benchmarks/run_benchmarks.py --concurrency 1,16 --payload-bytes 65536 --error-rate 0.01
+    python benchmarks/run_benchmarks.py --baseline bench-report.json --max-regression 0.25
+
+With --baseline the run is compared against an earlier report and the exit status
+is 1 when any tool's p95 latency grew, or its ops/sec dropped, by more than
+--max-regression (a fraction).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_iris
+import iris_execute_mcp as server
+from fastmcp import Client
+from bench_pool import percentile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+server.iris = fake_iris
+server.IRIS_AVAILABLE = True
+logging.getLogger("iris_execute_mcp").setLevel(logging.CRITICAL)
+
+# Arguments per tool. Tools missing here are listed as skipped in the report.
+TOOL_ARGS = {
+    "execute_command": {"command": "SET x=1"},
+    "execute_script": {"commands": ["SET x=1", "SET y=x*2", "WRITE y"]},
+    "get_global": {"global_ref": "^Bench(1)"},
+    "set_global": {"global_ref": "^Bench(1)", "value": "x"},
+    "get_globals": {"global_refs": ["^Bench(1)", "^Bench(2)", "^Bench(3)"]},
+    "set_globals": {"items": [{"globalRef": "^Bench(2)", "value": "y"}, {"globalRef": "^Bench(3)", "value": "z"}]},
+    "list_global": {"global_ref": "^Bench"},
+    "get_system_info": {},
+    "execute_classmethod": {"class_name": "%SYSTEM.Version", "method_name": "GetVersion"},
+    "profile_classmethod": {"class_name": "Bench.Work", "method_name": "Run"},
+    "execute_sql": {"sql": "SELECT ID, Name FROM Bench.Data", "page_size": 1000},
+    "fetch_sql": {"page_size": 1000},
+    "close_sql": {},
+    "execute_unit_tests": {"test_spec": "Bench.Tests"},
+    "discover_unit_tests": {"package": "Bench.Tests"},
+    "get_test_history": {"filter": "Bench.Tests"},
+    "get_test_results": {"run_id": 1},
+    "compile_objectscript_class": {"class_names": "Bench.Work"},
+    "compile_objectscript_package": {"package_name": "Bench"},
+    "submit_unit_tests": {"test_spec": "Bench.Tests"},
+    "submit_compile_classes": {"class_names": "Bench.Work"},
+    "submit_compile_package": {"package_name": "Bench"},
+    "poll_job": {"job_id": 1},
+    "cancel_job": {"job_id": 1},
+    "get_server_metrics": {},
+}
+
+# Tools that need an open SQL cursor: one is opened (untimed) before each call
+CURSOR_TOOLS = ("fetch_sql", "close_sql")
+
+
+def is_error(text: str) -> bool:
+    """True when a tool response reports an error status."""
+    try:
+        return json.loads(text).get("status") == "error"
+    except (json.JSONDecodeError, AttributeError):
+        return True
+
+
+def max_rss_kb():
+    """Peak resident set size of this process in KB (None where unavailable)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KB elsewhere
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_tool(client, name: str, calls: int, concurrency: int, trace_memory: bool) -> dict:
+    """Call one tool `calls` times with at most `concurrency` calls in flight."""
+    args = TOOL_ARGS[name]
+    latencies = []
+    errors = 0
+    gate = asyncio.Semaphore(concurrency)
+    # Open cursors pin pooled connections - stay within the server's cursor limit
+    cursor_gate = asyncio.Semaphore(max(1, server.SQL_MAX_CURSORS))
+
+    async def one_call():
+        nonlocal errors
+        async with gate:
+            if name in CURSOR_TOOLS:
+                async with cursor_gate:
+                    opened = await client.call_tool("execute_sql", {"sql": "SELECT ID FROM Bench.Data", "page_size": 1})
+                    call_args = dict(args, cursor_id=json.loads(opened.content[0].text).get("cursorId", "none"))
+                    start = time.perf_counter()
+                    result = await client.call_tool(name, call_args, raise_on_error=False)
+            else:
+                start = time.perf_counter()
+                result = await client.call_tool(name, args, raise_on_error=False)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if result.is_error or is_error(result.content[0].text):
+                errors += 1
+
+    if trace_memory:
+        tracemalloc.reset_peak()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one_call() for _ in range(calls)))
+    wall = time.perf_counter() - wall_start
+
+    return {
+        "calls": calls,
+        "errors": errors,
+        "wallSeconds": round(wall, 4),
+        "opsPerSec": round(calls / wall, 1),
+        "p50Ms": round(percentile(latencies, 50), 3),
+        "p95Ms": round(percentile(latencies, 95), 3),
+        "p99Ms": round(percentile(latencies, 99), 3),
+        "maxMs": round(max(latencies), 3),
+        "peakTracedBytes": tracemalloc.get_traced_memory()[1] if trace_memory else None,
+    }
+
+
+async def run_suite(tools: list, calls: int, levels: list, trace_memory: bool) -> list:
+    """Every tool at every concurrency level; returns one entry per level."""
+    runs = []
+    async with Client(server.mcp) as client:
+        # Warm the pool outside the measurement
+        await client.call_tool("get_system_info", {})
+        for concurrency in levels:
+            results = {}
+            for name in tools:
+                fake_iris.reset_stats()
+                results[name] = await run_tool(client, name, calls, concurrency, trace_memory)
+                results[name]["backend"] = dict(fake_iris.stats)
+                print(f"  c={concurrency:<4} {name:<30} {results[name]['opsPerSec']:>9.1f} ops/s "
+                      f"p50 {results[name]['p50Ms']:>8.2f}  p95 {results[name]['p95Ms']:>8.2f}  "
+                      f"p99 {results[name]['p99Ms']:>8.2f} ms  errors {results[name]['errors']}", file=sys.stderr)
+            runs.append({"concurrency": concurrency, "tools": results, "maxRssKb": max_rss_kb()})
+    return runs
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list:
+    """Tool/level pairs whose p95 or ops/sec regressed beyond max_regression."""
+    regressions = []
+    previous = {run["concurrency"]: run["tools"] for run in baseline.get("runs", [])}
+    for run in report["runs"]:
+        for name, current in run["tools"].items():
+            before = previous.get(run["concurrency"], {}).get(name)
+            if not before:
+                continue
+            if before["p95Ms"] > 0 and current["p95Ms"] > before["p95Ms"] * (1 + max_regression):
+                regressions.append(f"{name} c={run['concurrency']}: p95 {before['p95Ms']}ms -> {current['p95Ms']}ms")
+            if current["opsPerSec"] < before["opsPerSec"] * (1 - max_regression):
+                regressions.append(f"{name} c={run['concurrency']}: {before['opsPerSec']} -> "
+                                   f"{current['opsPerSec']} ops/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100, help="calls per tool and concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--tools", default="", help="comma-separated subset of tools (default: all)")
+    parser.add_argument("--connect-ms", type=float, default=20)
+    parser.add_argument("--call-ms", type=float, default=1, help="simulated latency of every IRIS call")
+    parser.add_argument("--method-ms", action="append", default=[], metavar="CLASS.METHOD=MS",
+                        help="latency override for one method, e.g. ExecuteMCP.Core.Compile.CompilePackage=200")
+    parser.add_argument("--payload-bytes", type=int, default=0, help="output characters in each response")
+    parser.add_argument("--sql-rows", type=int, default=1000, help="rows in every simulated SELECT")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with an error")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="fraction of calls that drop the connection")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true", help="record Python heap peaks (slower)")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    method_latency = {}
+    for item in args.method_ms:
+        method, _, ms = item.partition("=")
+        method_latency[method] = float(ms) / 1000
+    config = {
+        "calls": args.calls,
+        "connectMs": args.connect_ms,
+        "callMs": args.call_ms,
+        "methodMs": {method: seconds * 1000 for method, seconds in method_latency.items()},
+        "payloadBytes": args.payload_bytes,
+        "sqlRows": args.sql_rows,
+        "errorRate": args.error_rate,
+        "disconnectRate": args.disconnect_rate,
+        "seed": args.seed,
+        "poolMaxSize": server.POOL_MAX_SIZE,
+        "concurrencyLimits": dict(server.CONCURRENCY_LIMITS),
+    }
+    fake_iris.configure(
+        connect_latency=args.connect_ms / 1000,
+        call_latency=args.call_ms / 1000,
+        method_latency=method_latency,
+        sql_rows=args.sql_rows,
+        payload_bytes=args.payload_bytes,
+        error_rate=args.error_rate,
+        disconnect_rate=args.disconnect_rate,
+        seed=args.seed,
+    )
+
+    registered = [tool.name for tool in asyncio.run(server.mcp.list_tools())]
+    requested = [name.strip() for name in args.tools.split(",") if name.strip()] or registered
+    tools = [name for name in requested if name in TOOL_ARGS and name in registered]
+    skipped = [name for name in requested if name not in tools]
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    runs = asyncio.run(run_suite(tools, args.calls, levels, args.trace_memory))
+
+    report = {
+        "suite": "iris-execute-mcp",
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "durationSeconds": round(time.perf_counter() - started, 2),
+        "skipped": skipped,
+        "runs": runs,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
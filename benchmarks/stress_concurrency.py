@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for execute_classmethod against a live IRIS instance.
+
+Fires many simultaneous execute_classmethod calls to
+ExecuteMCP.Test.ConcurrencyProbe.Echo, each with a unique token, through the
+in-process FastMCP client and checks that every response carries only its own
+token in the return value, output parameter and captured WRITE output.
+
+Requires the ExecuteMCP classes (including ExecuteMCP.Test) to be loaded and
+the usual IRIS_* connection settings:
+
+    python benchmarks/stress_concurrency.py --calls 200 --concurrency 32 --delay-ms 50
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import iris_execute_mcp as server
+from fastmcp import Client
+
+logging.getLogger("iris_execute_mcp").setLevel(logging.WARNING)
+
+PROBE_CLASS = "ExecuteMCP.Test.ConcurrencyProbe"
+PROBE_METHOD = "Echo"
+
+
+def tool_text(result) -> str:
+    """Text payload of a FastMCP tool result."""
+    return result.content[0].text
+
+
+def check_response(token: str, response: dict) -> list:
+    """Return a list of problems found in one probe response."""
+    if response.get("status") != "success":
+        return [f"error: {response.get('errorMessage') or response.get('error')}"]
+
+    problems = []
+    if response.get("methodResult") != f"ret:{token}":
+        problems.append(f"methodResult {response.get('methodResult')!r}")
+    echo = (response.get("outputParameters") or {}).get("param3")
+    if echo != f"out:{token}":
+        problems.append(f"output parameter {echo!r}")
+    output = response.get("capturedOutput", "")
+    expected_output = f"write:{token}\r\ndone:{token}"
+    if output != expected_output:
+        problems.append(f"capturedOutput {output!r}")
+    return problems
+
+
+async def run(calls: int, concurrency: int, delay_ms: int, namespace: str) -> dict:
+    """Fire all probe calls with at most `concurrency` in flight."""
+    gate = asyncio.Semaphore(concurrency)
+    failures = []
+    latencies = []
+
+    async with Client(server.mcp) as client:
+        async def one_call(index: int):
+            token = f"{index}-{uuid.uuid4().hex}"
+            async with gate:
+                start = time.perf_counter()
+                result = await client.call_tool("execute_classmethod", {
+                    "class_name": PROBE_CLASS,
+                    "method_name": PROBE_METHOD,
+                    "parameters": [
+                        {"value": token},
+                        {"value": delay_ms},
+                        {"value": "", "isOutput": True},
+                    ],
+                    "namespace": namespace,
+                })
+                latencies.append((time.perf_counter() - start) * 1000)
+            problems = check_response(token, json.loads(tool_text(result)))
+            if problems:
+                failures.append((token, problems))
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(one_call(i) for i in range(calls)))
+        wall = time.perf_counter() - wall_start
+
+    return {"wall": wall, "failures": failures, "latencies": latencies}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--delay-ms", type=int, default=50, help="time each probe call holds its slot")
+    parser.add_argument("--namespace", default="HSCUSTOM")
+    args = parser.parse_args()
+
+    if not server.IRIS_AVAILABLE:
+        print("intersystems-irispython is not installed; this stress test needs a live IRIS instance")
+        return 2
+
+    result = asyncio.run(run(args.calls, args.concurrency, args.delay_ms, args.namespace))
+
+    print(f"{args.calls} calls, concurrency {args.concurrency}, wall {result['wall']:.2f}s")
+    print(f"execute budget: {server.CONCURRENCY_LIMITS['execute']}, max latency {max(result['latencies']):.1f} ms")
+    for token, problems in result["failures"][:20]:
+        print(f"  {token}: {'; '.join(problems)}")
+    if result["failures"]:
+        print(f"FAILED: {len(result['failures'])} of {args.calls} responses had cross-talk or errors")
+        return 1
+    print("OK: every response carried only its own token")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,12 +4,22 @@ IRIS Execute MCP Server - Production FastMCP Implementation
 Provides execute_command tool for IRIS ObjectScript execution via MCP protocol.
 """
 
+import asyncio
 import logging
 import sys
 import json
 import os
+import re
+import weakref
+import functools
+import itertools
 import signal
-from concurrent.futures import TimeoutError, ThreadPoolExecutor
+import time
+import atexit
+import bisect
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import threading
 
 try:
@@ -32,126 +42,2349 @@ logger = logging.getLogger(__name__)
 # Create FastMCP server
 mcp = FastMCP("iris-execute-mcp")
 
-# Global thread pool executor for timeout handling
-executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="iris-mcp")
+# Per-tool-class concurrency budgets, so long compiles and test runs cannot
+# starve cheap global reads of executor threads or pooled connections:
+#   quick   - get_global, set_global, get_globals, set_globals, list_global, get_system_info,
+#             discover_unit_tests, get_test_history, get_test_results, close_sql,
+#             submit_* / poll_job / cancel_job (they only record or read job state)
+#   execute - execute_command, execute_script, execute_classmethod, execute_sql, fetch_sql
+#   compile - compile_objectscript_class, compile_objectscript_package
+#   test    - execute_unit_tests
+#   profile - profile_classmethod (the line-by-line monitor is system-wide, one session at a time)
+CONCURRENCY_LIMITS = {
+    "quick": int(os.getenv('IRIS_CONCURRENCY_QUICK', '8')),
+    "execute": int(os.getenv('IRIS_CONCURRENCY_EXECUTE', '4')),
+    "compile": int(os.getenv('IRIS_CONCURRENCY_COMPILE', '2')),
+    "test": int(os.getenv('IRIS_CONCURRENCY_TEST', '2')),
+    "profile": int(os.getenv('IRIS_CONCURRENCY_PROFILE', '1')),
+}
 
-def call_iris_with_timeout(class_name: str, method_name: str, timeout: float = 30.0, *args):
+# Global thread pool executor for blocking Native API calls, sized so every
+# tool class can use its full budget without queueing behind another
+executor = ThreadPoolExecutor(max_workers=sum(CONCURRENCY_LIMITS.values()), thread_name_prefix="iris-mcp")
+
+# =====================================================================================
+# IRIS CONNECTION POOL
+# =====================================================================================
+
+# Pool configuration from environment (read at import, may be overridden for testing)
+POOL_ENABLED = os.getenv('IRIS_POOL_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+POOL_MIN_SIZE = int(os.getenv('IRIS_POOL_MIN_SIZE', '0'))
+POOL_MAX_SIZE = int(os.getenv('IRIS_POOL_MAX_SIZE', str(sum(CONCURRENCY_LIMITS.values()))))
+POOL_IDLE_TIMEOUT = float(os.getenv('IRIS_POOL_IDLE_TIMEOUT', '300'))
+POOL_CHECKOUT_TIMEOUT = float(os.getenv('IRIS_POOL_CHECKOUT_TIMEOUT', '30'))
+POOL_HEALTH_CHECK_INTERVAL = float(os.getenv('IRIS_POOL_HEALTH_CHECK_INTERVAL', '30'))
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled IRIS connection becomes available in time."""
+
+
+class PooledConnection:
+    """
+    A Native API connection together with its IRIS object.
+    The IRIS object is created once per connection and reused for every call.
+    """
+
+    def __init__(self, conn, iris_obj):
+        self.conn = conn
+        self.iris_obj = iris_obj
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        # Server process ($JOB) serving this connection, used to terminate timed-out calls
+        self.server_job = None
+
+    def load_server_job(self):
+        """Record the server-side $JOB of this connection (best effort)."""
+        try:
+            self.server_job = self.iris_obj.classMethodValue("%SYSTEM.SYS", "ProcessID")
+        except Exception as e:
+            logger.warning(f"Could not determine server $JOB for IRIS connection: {str(e)}")
+
+    def is_closed(self) -> bool:
+        """Report whether the underlying socket is known to be closed."""
+        is_closed = getattr(self.conn, "isClosed", None)
+        try:
+            return bool(is_closed()) if is_closed else False
+        except Exception:
+            return True
+
+    def close(self):
+        """Close the underlying connection, ignoring errors from dead sockets."""
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+def open_connection(hostname: str, port: int, namespace: str, username: str, password: str) -> PooledConnection:
+    """Open a Native API connection and look up the server process serving it."""
+    conn = iris.connect(hostname, port, namespace, username, password)
+    try:
+        iris_obj = iris.createIRIS(conn)
+    except Exception:
+        conn.close()
+        raise
+    pooled = PooledConnection(conn, iris_obj)
+    pooled.load_server_job()
+    return pooled
+
+
+class ConnectionPool:
+    """
+    Bounded pool of IRIS Native API connections for one host/port/namespace/user.
+
+    Connections are created lazily up to max_size, health checked on checkout,
+    and evicted once idle for longer than idle_timeout (never below min_size).
+    A connection released with reset set (it ran user code) has any open
+    transaction rolled back and its locks released before it is reused.
+    """
+
+    def __init__(self, hostname: str, port: int, namespace: str, username: str, password: str,
+                 min_size: int = 0, max_size: int = 4, idle_timeout: float = 300.0,
+                 checkout_timeout: float = 30.0, health_check_interval: float = 30.0):
+        self.hostname = hostname
+        self.port = port
+        self.namespace = namespace
+        self.username = username
+        self._password = password
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        self._cond = threading.Condition()
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._metrics = {
+            "checkouts": 0,
+            "waits": 0,
+            "creates": 0,
+            "evictions": 0,
+            "discards": 0,
+            "reconnects": 0,
+            "timeouts": 0,
+            "resets": 0,
+            "rollbacks": 0,
+        }
+
+    def _connect(self) -> PooledConnection:
+        """Open a new Native API connection (called without the pool lock held)."""
+        return open_connection(self.hostname, self.port, self.namespace, self.username, self._password)
+
+    def _is_healthy(self, pooled: PooledConnection) -> bool:
+        """Cheap liveness check; pings the server only after a long idle period."""
+        if pooled.is_closed():
+            return False
+        if time.monotonic() - pooled.last_used < self.health_check_interval:
+            return True
+        try:
+            pooled.iris_obj.classMethodValue("%SYSTEM.SYS", "ProcessID")
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled IRIS connection failed health check: {str(e)}")
+            return False
+
+    def _evict_idle_locked(self):
+        """Close connections idle past idle_timeout. Caller must hold the lock."""
+        now = time.monotonic()
+        # Idle list is LIFO, so the oldest idle connections are at the front
+        while self._idle and self._size > self.min_size:
+            if now - self._idle[0].last_used < self.idle_timeout:
+                break
+            pooled = self._idle.pop(0)
+            self._size -= 1
+            self._metrics["evictions"] += 1
+            pooled.close()
+
+    def acquire(self, timeout: float = None) -> PooledConnection:
+        """
+        Check out a healthy connection, creating one if the pool has room.
+        Blocks up to timeout seconds when the pool is exhausted.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            self._metrics["checkouts"] += 1
+
+        waited = False
+        while True:
+            pooled = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("Connection pool is closed")
+                    self._evict_idle_locked()
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    if not waited:
+                        waited = True
+                        self._metrics["waits"] += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"No IRIS connection available within {timeout}s "
+                            f"(pool size {self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+
+            if pooled is None:
+                # Reserved a slot above - create the connection outside the lock
+                try:
+                    pooled = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._metrics["creates"] += 1
+                return pooled
+
+            if self._is_healthy(pooled):
+                return pooled
+
+            # Stale connection - drop it and try again
+            self.release(pooled, discard=True)
+
+    def release(self, pooled: PooledConnection, discard: bool = False, reset: bool = False):
+        """
+        Return a connection to the pool, or close it if discard is set or it is broken.
+        With reset, the server process is cleaned up first (see _reset) and discarded
+        if that fails.
+        """
+        if not discard and pooled.is_closed():
+            discard = True
+        if reset and not discard and not self._closed:
+            discard = not self._reset(pooled)
+
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+                if discard:
+                    self._metrics["discards"] += 1
+            else:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+            self._cond.notify()
+
+        if discard or self._closed:
+            pooled.close()
+
+    def _reset(self, pooled: PooledConnection) -> bool:
+        """
+        Roll back a transaction left open by the last call and release the process's
+        locks, so the next borrower does not run inside them. False if that failed.
+        """
+        try:
+            level = int(pooled.iris_obj.classMethodValue("ExecuteMCP.Core.Command", "ResetProcess"))
+        except Exception as e:
+            logger.warning(f"Could not reset pooled IRIS process {pooled.server_job}, discarding it: {str(e)}")
+            return False
+        with self._cond:
+            self._metrics["resets"] += 1
+            if level:
+                self._metrics["rollbacks"] += 1
+        if level:
+            logger.warning(f"Rolled back a transaction (level {level}) left open on IRIS process {pooled.server_job}")
+        return True
+
+    def record_reconnect(self):
+        """Count a call that was retried on a fresh connection after a broken socket."""
+        with self._cond:
+            self._metrics["reconnects"] += 1
+
+    def fill(self):
+        """Pre-open connections up to min_size."""
+        opened = []
+        try:
+            while True:
+                with self._cond:
+                    if self._size >= self.min_size or self._size >= self.max_size:
+                        break
+                    self._size += 1
+                try:
+                    pooled = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                    raise
+                with self._cond:
+                    self._metrics["creates"] += 1
+                opened.append(pooled)
+        finally:
+            for pooled in opened:
+                self.release(pooled)
+
+    def close(self):
+        """Close all idle connections; in-use connections are closed on release."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            pooled.close()
+
+    def stats(self) -> dict:
+        """Snapshot of pool configuration, occupancy and counters."""
+        with self._cond:
+            stats = {
+                "hostname": self.hostname,
+                "port": self.port,
+                "namespace": self.namespace,
+                "username": self.username,
+                "minSize": self.min_size,
+                "maxSize": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "inUse": self._size - len(self._idle),
+            }
+            stats.update(self._metrics)
+        return stats
+
+
+# Pools keyed by (hostname, port, namespace, username)
+_connection_pools = {}
+_connection_pools_lock = threading.Lock()
+
+
+def get_connection_settings(namespace: str = None) -> dict:
+    """IRIS connection parameters from environment; namespace overrides IRIS_NAMESPACE."""
+    return {
+        "hostname": os.getenv('IRIS_HOSTNAME', 'localhost'),
+        "port": int(os.getenv('IRIS_PORT', '1972')),
+        "namespace": namespace or os.getenv('IRIS_NAMESPACE', 'HSCUSTOM'),
+        "username": os.getenv('IRIS_USERNAME', '_SYSTEM'),
+        "password": os.getenv('IRIS_PASSWORD', '_SYSTEM'),
+    }
+
+
+def get_connection_pool(namespace: str = None) -> ConnectionPool:
+    """Get (or create) the connection pool for the configured server and namespace."""
+    settings = get_connection_settings(namespace)
+    key = (settings["hostname"], settings["port"], settings["namespace"], settings["username"])
+
+    with _connection_pools_lock:
+        pool = _connection_pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                min_size=POOL_MIN_SIZE,
+                max_size=POOL_MAX_SIZE,
+                idle_timeout=POOL_IDLE_TIMEOUT,
+                checkout_timeout=POOL_CHECKOUT_TIMEOUT,
+                health_check_interval=POOL_HEALTH_CHECK_INTERVAL,
+                **settings
+            )
+            _connection_pools[key] = pool
+            logger.info(f"Created IRIS connection pool for {key[0]}:{key[1]}/{key[2]} (max {pool.max_size})")
+        return pool
+
+
+def close_connection_pools():
+    """Close every connection pool (registered to run at interpreter exit)."""
+    with _connection_pools_lock:
+        pools = list(_connection_pools.values())
+        _connection_pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_connection_pools)
+
+
+def is_connection_error(error: Exception, pooled: PooledConnection) -> bool:
+    """True when a failed call points at a broken socket rather than an IRIS-side error."""
+    return isinstance(error, (OSError, ConnectionError)) or pooled.is_closed()
+
+
+# =====================================================================================
+# IN-FLIGHT CALL TRACKING AND CANCELLATION
+# =====================================================================================
+
+# Cancellation configuration from environment
+CANCEL_GRACE_PERIOD = float(os.getenv('IRIS_CANCEL_GRACE_PERIOD', '5'))
+CANCEL_CHECKOUT_TIMEOUT = float(os.getenv('IRIS_CANCEL_CHECKOUT_TIMEOUT', '5'))
+
+
+class CallCancelledError(Exception):
+    """Raised in a worker whose call was cancelled before it reached IRIS."""
+
+
+_call_ids = itertools.count(1)
+_inflight_calls = {}
+_call_stats_lock = threading.Lock()
+_call_stats = {
+    "timedOut": 0,
+    "timedOutQueued": 0,
+    "terminated": 0,
+    "terminateFailures": 0,
+    "cancelled": 0,
+    "leaked": 0,
+    "leakedActive": 0,
+}
+
+
+def record_call_stat(name: str, delta: int = 1):
+    """Adjust one of the call cancellation counters."""
+    with _call_stats_lock:
+        _call_stats[name] += delta
+
+
+class InFlightCall:
+    """
+    Tracks one IRIS call that is running in a worker thread, including the
+    connection (and therefore the server $JOB) it is executing on.
+    """
+
+    def __init__(self, class_name: str, method_name: str, tool_class: str = "quick"):
+        self.call_id = next(_call_ids)
+        self.class_name = class_name
+        self.method_name = method_name
+        # Every tool class but "quick" can run user code, which may leave a transaction or locks behind
+        self.runs_user_code = tool_class != "quick"
+        self.started = time.monotonic()
+        self.cancelled = False
+        self.server_job = None
+        self._pooled = None
+        self._lock = threading.Lock()
+        with _call_stats_lock:
+            _inflight_calls[self.call_id] = self
+
+    def attach(self, pooled: PooledConnection) -> bool:
+        """Bind the call to the connection it runs on; False if already cancelled."""
+        with self._lock:
+            if self.cancelled:
+                return False
+            self._pooled = pooled
+            self.server_job = pooled.server_job
+            return True
+
+    def detach(self) -> bool:
+        """Unbind the connection after the call returns; True if it was cancelled meanwhile."""
+        with self._lock:
+            self._pooled = None
+            return self.cancelled
+
+    def cancel(self) -> str:
+        """
+        Stop the call: terminate its server process, or close its connection when
+        the process cannot be terminated. Returns the action taken.
+        """
+        with self._lock:
+            self.cancelled = True
+            pooled = self._pooled
+        if pooled is None:
+            return "not_started"
+        if pooled.server_job is not None and terminate_server_job(pooled.server_job):
+            return "terminated"
+        # The worker's pending read fails once its socket is closed
+        pooled.close()
+        return "closed"
+
+    def finish(self):
+        """Stop tracking the call."""
+        with _call_stats_lock:
+            _inflight_calls.pop(self.call_id, None)
+
+    def describe(self) -> dict:
+        return {
+            "callId": self.call_id,
+            "method": f"{self.class_name}.{self.method_name}",
+            "serverJob": self.server_job,
+            "elapsedSeconds": round(time.monotonic() - self.started, 3),
+            "cancelled": self.cancelled,
+        }
+
+
+def terminate_server_job(job) -> bool:
+    """
+    Terminate an IRIS process via $SYSTEM.Process.Terminate on a separate connection.
+    Requires the IRIS user to be allowed to terminate processes.
+    """
+    control = None
+    pool = get_connection_pool() if POOL_ENABLED else None
+    try:
+        if pool is not None:
+            try:
+                control = pool.acquire(timeout=CANCEL_CHECKOUT_TIMEOUT)
+            except PoolTimeoutError:
+                pool = None
+        if control is None:
+            control = open_connection(**get_connection_settings())
+
+        status = control.iris_obj.classMethodValue("%SYSTEM.Process", "Terminate", job)
+        if str(status) != "1":
+            logger.warning(f"Could not terminate IRIS process {job}: {status}")
+            return False
+        logger.warning(f"Terminated IRIS process {job} running a timed-out call")
+        return True
+
+    except Exception as e:
+        logger.warning(f"Could not terminate IRIS process {job}: {str(e)}")
+        return False
+    finally:
+        if control is not None:
+            if pool is not None:
+                pool.release(control)
+            else:
+                control.close()
+
+
+def get_call_stats() -> dict:
+    """Timeout/cancellation counters and the calls currently in flight."""
+    with _call_stats_lock:
+        stats = dict(_call_stats)
+        inflight = list(_inflight_calls.values())
+    stats["inFlight"] = [call.describe() for call in inflight]
+    return stats
+
+
+# =====================================================================================
+# TOOL CALL METRICS
+# =====================================================================================
+
+# Optional Prometheus text file export (e.g. for the node_exporter textfile collector)
+METRICS_FILE = os.getenv('IRIS_METRICS_FILE', '')
+METRICS_FILE_INTERVAL = float(os.getenv('IRIS_METRICS_FILE_INTERVAL', '15'))
+
+# Histogram bucket upper bounds in milliseconds
+METRICS_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# Phase timings of the tool call running in the current task:
+# queue (concurrency slot), checkout (pool), rpc (IRIS call), parse (response JSON)
+_current_span = contextvars.ContextVar("iris_mcp_span", default=None)
+
+_tool_metrics = {}
+_tool_metrics_lock = threading.Lock()
+_metrics_file_written = 0.0
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds."""
+
+    def __init__(self):
+        self.counts = [0] * (len(METRICS_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(METRICS_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (the maximum for the overflow bucket)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(METRICS_BUCKETS_MS[index], self.max) if index < len(METRICS_BUCKETS_MS) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "meanMs": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50Ms": round(self.quantile(0.50), 3),
+            "p95Ms": round(self.quantile(0.95), 3),
+            "p99Ms": round(self.quantile(0.99), 3),
+            "maxMs": round(self.max, 3),
+        }
+
+
+def record_span_phase(phase: str, seconds: float):
+    """Add time to a phase of the current tool call's span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span[phase] = span.get(phase, 0.0) + seconds
+
+
+def record_tool_call(tool: str, span: dict, seconds: float):
+    """Fold one finished tool call into the per-tool histograms."""
+    with _tool_metrics_lock:
+        metrics = _tool_metrics.get(tool)
+        if metrics is None:
+            metrics = _tool_metrics[tool] = {"calls": 0, "errors": 0, "phases": {}}
+        metrics["calls"] += 1
+        if span.get("status") == "error":
+            metrics["errors"] += 1
+        phases = metrics["phases"]
+        for phase, value in [("total", seconds)] + [(k, v) for k, v in span.items() if k != "status"]:
+            phases.setdefault(phase, LatencyHistogram()).observe(value * 1000)
+
+
+def get_tool_metrics() -> dict:
+    """Call and error counts plus latency percentiles per tool and phase."""
+    with _tool_metrics_lock:
+        return {
+            tool: {
+                "calls": metrics["calls"],
+                "errors": metrics["errors"],
+                "phases": {phase: hist.snapshot() for phase, hist in metrics["phases"].items()},
+            }
+            for tool, metrics in sorted(_tool_metrics.items())
+        }
+
+
+def instrumented(func):
+    """Record total and per-phase latency of every call to a tool handler."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        span = {}
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _current_span.reset(token)
+            record_tool_call(func.__name__, span, time.perf_counter() - start)
+            maybe_write_metrics_file()
+    return wrapper
+
+
+def parse_iris_result(result: str):
+    """json.loads an IRIS response, timed as the parse phase of the current tool call."""
+    start = time.perf_counter()
+    try:
+        parsed = json.loads(result)
+    finally:
+        record_span_phase("parse", time.perf_counter() - start)
+    span = _current_span.get()
+    if span is not None and isinstance(parsed, dict):
+        span["status"] = parsed.get("status")
+    return parsed
+
+
+def _prometheus_labels(**labels) -> str:
+    """Render a Prometheus label set, escaping backslashes and quotes in values."""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def render_prometheus_metrics() -> str:
+    """Tool, concurrency and pool metrics in the Prometheus text exposition format."""
+    lines = [
+        "# HELP iris_mcp_tool_calls_total Tool calls handled.",
+        "# TYPE iris_mcp_tool_calls_total counter",
+    ]
+    with _tool_metrics_lock:
+        tools = [(tool, metrics["calls"], metrics["errors"],
+                  [(phase, list(hist.counts), hist.count, hist.total) for phase, hist in metrics["phases"].items()])
+                 for tool, metrics in sorted(_tool_metrics.items())]
+    for tool, calls, _, _ in tools:
+        lines.append(f"iris_mcp_tool_calls_total{_prometheus_labels(tool=tool)} {calls}")
+    lines += [
+        "# HELP iris_mcp_tool_errors_total Tool calls that returned an error status.",
+        "# TYPE iris_mcp_tool_errors_total counter",
+    ]
+    for tool, _, errors, _ in tools:
+        lines.append(f"iris_mcp_tool_errors_total{_prometheus_labels(tool=tool)} {errors}")
+    lines += [
+        "# HELP iris_mcp_tool_phase_seconds Tool call latency by phase (total, queue, checkout, rpc, parse).",
+        "# TYPE iris_mcp_tool_phase_seconds histogram",
+    ]
+    for tool, _, _, phases in tools:
+        for phase, counts, count, total in phases:
+            cumulative = 0
+            for bound, bucket_count in zip(METRICS_BUCKETS_MS + (None,), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound is None else repr(bound / 1000)
+                lines.append(f"iris_mcp_tool_phase_seconds_bucket{_prometheus_labels(tool=tool, phase=phase, le=le)} {cumulative}")
+            lines.append(f"iris_mcp_tool_phase_seconds_sum{_prometheus_labels(tool=tool, phase=phase)} {total / 1000}")
+            lines.append(f"iris_mcp_tool_phase_seconds_count{_prometheus_labels(tool=tool, phase=phase)} {count}")
+
+    lines += [
+        "# HELP iris_mcp_concurrency_active IRIS calls running per tool class.",
+        "# TYPE iris_mcp_concurrency_active gauge",
+    ]
+    concurrency = get_concurrency_stats()
+    for tool_class, stats in concurrency.items():
+        lines.append(f"iris_mcp_concurrency_active{_prometheus_labels(tool_class=tool_class)} {stats['active']}")
+    lines += [
+        "# HELP iris_mcp_concurrency_waiting IRIS calls waiting for a slot per tool class.",
+        "# TYPE iris_mcp_concurrency_waiting gauge",
+    ]
+    for tool_class, stats in concurrency.items():
+        lines.append(f"iris_mcp_concurrency_waiting{_prometheus_labels(tool_class=tool_class)} {stats['waiting']}")
+
+    with _connection_pools_lock:
+        pools = [pool.stats() for pool in _connection_pools.values()]
+    lines += [
+        "# HELP iris_mcp_pool_connections Pooled IRIS connections by state.",
+        "# TYPE iris_mcp_pool_connections gauge",
+    ]
+    for stats in pools:
+        for state, key in (("idle", "idle"), ("in_use", "inUse")):
+            lines.append(f"iris_mcp_pool_connections{_prometheus_labels(namespace=stats['namespace'], state=state)} {stats[key]}")
+
+    if COALESCE_READS:
+        lines += [
+            "# HELP iris_mcp_coalesced_reads_total Read calls answered by an identical call already in flight.",
+            "# TYPE iris_mcp_coalesced_reads_total counter",
+        ]
+        for tool, count in sorted(_coalesced_by_tool.items()):
+            lines.append(f"iris_mcp_coalesced_reads_total{_prometheus_labels(tool=tool)} {count}")
+
+    if RESULT_CACHE_ENABLED:
+        lines += [
+            "# HELP iris_mcp_result_cache_events_total Result cache lookups and entry removals by event.",
+            "# TYPE iris_mcp_result_cache_events_total counter",
+        ]
+        for event, count in _result_cache_stats.items():
+            lines.append(f"iris_mcp_result_cache_events_total{_prometheus_labels(event=event)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file():
+    """Atomically replace IRIS_METRICS_FILE with the current Prometheus metrics."""
+    global _metrics_file_written
+    _metrics_file_written = time.monotonic()
+    try:
+        temp_path = f"{METRICS_FILE}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            handle.write(render_prometheus_metrics())
+        os.replace(temp_path, METRICS_FILE)
+    except OSError as e:
+        logger.warning(f"Could not write metrics file {METRICS_FILE}: {str(e)}")
+
+
+def maybe_write_metrics_file():
+    """Export metrics when a file is configured and the export interval has passed."""
+    if METRICS_FILE and time.monotonic() - _metrics_file_written >= METRICS_FILE_INTERVAL:
+        write_metrics_file()
+
+
+if METRICS_FILE:
+    atexit.register(write_metrics_file)
+
+
+def call_iris_sync(class_name: str, method_name: str, *args, call=None):
+    """
+    Synchronous IRIS class method call.
+    Borrows a connection from the pool and retries once on a broken connection.
+    When an InFlightCall is given, the connection is attached to it so the call
+    can be terminated on timeout.
+    Returns JSON string response from IRIS.
+    """
+    if not IRIS_AVAILABLE:
+        return json.dumps({
+            "status": "error",
+            "error": "IRIS not available - intersystems-irispython not installed",
+            "output": "",
+            "namespace": "N/A"
+        })
+    
+    try:
+        if not POOL_ENABLED:
+            return call_iris_unpooled(class_name, method_name, *args, call=call)
+
+        result = run_pooled(
+            get_connection_pool(),
+            lambda pooled: pooled.iris_obj.classMethodString(class_name, method_name, *args),
+            f"{class_name}.{method_name}",
+            call=call
+        )
+        
+        logger.info(f"IRIS call successful: {class_name}.{method_name}")
+        return result
+        
+    except Exception as e:
+        error_msg = f"IRIS call failed: {str(e)}"
+        logger.error(error_msg)
+        return json.dumps({
+            "status": "error",
+            "error": error_msg,
+            "output": "",
+            "namespace": "N/A"
+        })
+
+
+def run_pooled(pool: ConnectionPool, operation, description: str, call=None):
+    """
+    Run operation(pooled) on a connection borrowed from the pool, retrying once
+    on a broken connection. Exceptions from the operation propagate.
+    """
+    reset = call is not None and call.runs_user_code
+    for attempt in (1, 2):
+        checkout_start = time.perf_counter()
+        pooled = pool.acquire()
+        record_span_phase("checkout", time.perf_counter() - checkout_start)
+        if call is not None and not call.attach(pooled):
+            # Timed out while waiting for a connection - nothing reached the server
+            pool.release(pooled)
+            raise CallCancelledError(f"Call cancelled before execution: {description}")
+        rpc_start = time.perf_counter()
+        try:
+            result = operation(pooled)
+        except Exception as e:
+            record_span_phase("rpc", time.perf_counter() - rpc_start)
+            broken = is_connection_error(e, pooled)
+            cancelled = call is not None and call.detach()
+            pool.release(pooled, discard=broken or cancelled, reset=reset)
+            if broken and attempt == 1 and not cancelled:
+                logger.warning(f"IRIS connection broken, reconnecting: {str(e)}")
+                pool.record_reconnect()
+                continue
+            raise
+        record_span_phase("rpc", time.perf_counter() - rpc_start)
+        cancelled = call is not None and call.detach()
+        pool.release(pooled, discard=cancelled, reset=reset)
+        return result
+
+
+def call_iris_unpooled(class_name: str, method_name: str, *args, call=None):
+    """
+    Open a dedicated connection for a single call (IRIS_POOL_ENABLED=false).
+    Exceptions propagate to the caller.
+    """
+    settings = get_connection_settings()
+    
+    # Connect to IRIS
+    pooled = open_connection(**settings)
+    try:
+        if call is not None and not call.attach(pooled):
+            raise CallCancelledError(f"Call cancelled before execution: {class_name}.{method_name}")
+        
+        # Call the class method
+        rpc_start = time.perf_counter()
+        try:
+            result = pooled.iris_obj.classMethodString(class_name, method_name, *args)
+        finally:
+            record_span_phase("rpc", time.perf_counter() - rpc_start)
+    finally:
+        if call is not None:
+            call.detach()
+        # Close connection
+        pooled.close()
+    
+    logger.info(f"IRIS call successful: {class_name}.{method_name}")
+    return result
+
+# =====================================================================================
+# ASYNC CALL LAYER
+# =====================================================================================
+
+# Semaphores per event loop and tool class (asyncio primitives are loop-bound)
+_concurrency_limiters = weakref.WeakKeyDictionary()
+_concurrency_active = {tool_class: 0 for tool_class in CONCURRENCY_LIMITS}
+_concurrency_waiting = {tool_class: 0 for tool_class in CONCURRENCY_LIMITS}
+
+
+def get_concurrency_limiter(tool_class: str) -> asyncio.Semaphore:
+    """Get the semaphore enforcing the concurrency budget of a tool class."""
+    loop = asyncio.get_running_loop()
+    limiters = _concurrency_limiters.get(loop)
+    if limiters is None:
+        limiters = {name: asyncio.Semaphore(limit) for name, limit in CONCURRENCY_LIMITS.items()}
+        _concurrency_limiters[loop] = limiters
+    return limiters[tool_class]
+
+
+async def call_iris_async(tool_class: str, class_name: str, method_name: str, timeout: float = 30.0, *args):
+    """
+    Call IRIS from a tool handler without blocking the FastMCP event loop.
+    The timeout covers both waiting for a concurrency slot and the call itself;
+    a call still running at the deadline is terminated on the server.
+    """
+    work = functools.partial(call_iris_sync, class_name, method_name, *args)
+    return await run_iris_async(tool_class, class_name, method_name, timeout, work)
+
+
+async def run_iris_async(tool_class: str, class_name: str, method_name: str, timeout: float, work):
+    """
+    Run work(call=InFlightCall) in the executor under the tool class budget and timeout.
+    class_name / method_name label the call in logs, errors and in-flight tracking.
+    """
+    logger.info(f"Starting IRIS call with {timeout}s timeout: {class_name}.{method_name}")
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    limiter = get_concurrency_limiter(tool_class)
+    
+    # Wait for a slot in the tool class budget
+    _concurrency_waiting[tool_class] += 1
+    queue_start = time.perf_counter()
+    try:
+        acquire = asyncio.ensure_future(limiter.acquire())
+        done, _ = await asyncio.wait({acquire}, timeout=timeout)
+        if not done:
+            acquire.cancel()
+            try:
+                await acquire
+            except asyncio.CancelledError:
+                pass
+    finally:
+        _concurrency_waiting[tool_class] -= 1
+        record_span_phase("queue", time.perf_counter() - queue_start)
+    
+    if acquire.cancelled():
+        record_call_stat("timedOut")
+        record_call_stat("timedOutQueued")
+        error_msg = f"IRIS call timed out after {timeout}s waiting for a {tool_class} slot: {class_name}.{method_name}"
+        logger.error(error_msg)
+        return json.dumps({
+            "status": "error",
+            "error": error_msg,
+            "output": "",
+            "namespace": "N/A",
+            "timeout": timeout
+        })
+    
+    _concurrency_active[tool_class] += 1
+    call = InFlightCall(class_name, method_name, tool_class)
+    future = None
+    try:
+        # The worker records checkout / rpc time into this task's span
+        context = contextvars.copy_context()
+        future = asyncio.wrap_future(executor.submit(context.run, functools.partial(work, call=call)))
+        done, _ = await asyncio.wait({future}, timeout=max(0.0, deadline - loop.time()))
+        if not done:
+            return await cancel_timed_out_call(call, future, timeout)
+        
+        result = future.result()
+        logger.info(f"IRIS call completed within timeout: {class_name}.{method_name}")
+        return result
+        
+    except Exception as e:
+        error_msg = f"IRIS call failed: {str(e)}"
+        logger.error(error_msg)
+        return json.dumps({
+            "status": "error",
+            "error": error_msg,
+            "output": "",
+            "namespace": "N/A"
+        })
+    finally:
+        if future is not None and not future.done():
+            # A leaked worker keeps its slot until its thread actually returns
+            future.add_done_callback(lambda _: release_call_slot(call, tool_class, limiter))
+        else:
+            release_call_slot(call, tool_class, limiter)
+
+
+def release_call_slot(call: InFlightCall, tool_class: str, limiter: asyncio.Semaphore):
+    """Stop tracking a finished call and return its slot to the tool class budget."""
+    call.finish()
+    _concurrency_active[tool_class] -= 1
+    limiter.release()
+
+
+async def cancel_timed_out_call(call: InFlightCall, future: asyncio.Future, timeout: float) -> str:
+    """
+    Terminate a call that exceeded its timeout and wait briefly for its worker
+    thread to return. Workers that do not return are counted as leaked; they stay
+    in flight and hold their concurrency slot until the thread returns.
+    """
+    record_call_stat("timedOut")
+    error_msg = f"IRIS call timed out after {timeout}s: {call.class_name}.{call.method_name}"
+    logger.error(error_msg)
+    
+    action = await asyncio.get_running_loop().run_in_executor(None, call.cancel)
+    if action == "terminated":
+        record_call_stat("terminated")
+    elif action == "closed":
+        record_call_stat("terminateFailures")
+    
+    done, _ = await asyncio.wait({future}, timeout=CANCEL_GRACE_PERIOD)
+    if done:
+        record_call_stat("cancelled")
+        outcome = "cancelled"
+    else:
+        record_call_stat("leaked")
+        record_call_stat("leakedActive")
+        future.add_done_callback(lambda _: record_call_stat("leakedActive", -1))
+        outcome = "leaked"
+        logger.error(f"Worker for timed-out call {call.call_id} still running after {CANCEL_GRACE_PERIOD}s")
+    
+    return json.dumps({
+        "status": "error",
+        "error": error_msg,
+        "output": "",
+        "namespace": "N/A",
+        "timeout": timeout,
+        "cancellation": outcome,
+        "serverJob": call.server_job
+    })
+
+
+def get_concurrency_stats() -> dict:
+    """Budget, running and queued call counts per tool class."""
+    return {
+        tool_class: {
+            "limit": limit,
+            "active": _concurrency_active[tool_class],
+            "waiting": _concurrency_waiting[tool_class],
+        }
+        for tool_class, limit in CONCURRENCY_LIMITS.items()
+    }
+
+# =====================================================================================
+# NATIVE GLOBAL ACCESS
+# =====================================================================================
+
+# get_global / set_global read and write plain global nodes with the Native API's own
+# get / set / isDefined operations instead of a round-trip through ObjectScript indirection
+NATIVE_GLOBALS = os.getenv('IRIS_NATIVE_GLOBALS', 'true').lower() not in ('0', 'false', 'no')
+# Seconds a %Development:USE check result is reused before IRIS is asked again
+NATIVE_ACCESS_TTL = float(os.getenv('IRIS_NATIVE_ACCESS_TTL', '60'))
+
+_GLOBAL_NAME_RE = re.compile(r'\^?(%?[A-Za-z][A-Za-z0-9]*(?:\.[A-Za-z0-9]+)*)')
+_INTEGER_SUBSCRIPT_RE = re.compile(r'-?(?:0|[1-9][0-9]{0,17})')
+
+# (expires at, %Development:USE check result) per (hostname, port, namespace, username)
+_native_global_access = {}
+_native_global_stats_lock = threading.Lock()
+_native_global_stats = {
+    "native": 0,
+    "fallbackUnparsed": 0,
+    "fallbackError": 0,
+    "errorAfterSend": 0,
+}
+
+
+def record_native_global_stat(name: str):
+    """Count one get_global / set_global call by the path it took."""
+    with _native_global_stats_lock:
+        _native_global_stats[name] += 1
+
+
+def get_native_global_stats() -> dict:
+    """Whether the native path is enabled and how many calls took each path."""
+    with _native_global_stats_lock:
+        stats = dict(_native_global_stats)
+    stats["enabled"] = NATIVE_GLOBALS and POOL_ENABLED
+    return stats
+
+
+def parse_global_ref(global_ref: str):
+    """
+    Split a global reference such as ^Name, Name, ^Name(1,"a""b") into (name, subscripts).
+    Subscripts are Python ints (integer literals) or strs (quoted literals).
+    Returns None for anything the native path does not handle: process-private and
+    extended references, indirection, variables, functions, decimal or empty subscripts.
+    """
+    ref = global_ref.strip()
+    match = _GLOBAL_NAME_RE.match(ref)
+    if match is None:
+        return None
+    name = match.group(1)
+    rest = ref[match.end():]
+    if not rest:
+        return name, []
+    if rest[0] != "(" or rest[-1] != ")":
+        return None
+
+    subscripts = []
+    body = rest[1:-1]
+    pos = 0
+    while True:
+        while pos < len(body) and body[pos] == " ":
+            pos += 1
+        if body.startswith('"', pos):
+            # Quoted string, "" is an escaped quote
+            chars = []
+            pos += 1
+            while True:
+                end = body.find('"', pos)
+                if end < 0:
+                    return None
+                chars.append(body[pos:end])
+                if body.startswith('""', end):
+                    chars.append('"')
+                    pos = end + 2
+                    continue
+                pos = end + 1
+                break
+            subscript = "".join(chars)
+            if subscript == "":
+                return None
+            subscripts.append(subscript)
+        else:
+            match = _INTEGER_SUBSCRIPT_RE.match(body, pos)
+            if match is None:
+                return None
+            subscripts.append(int(match.group(0)))
+            pos = match.end()
+        while pos < len(body) and body[pos] == " ":
+            pos += 1
+        if pos == len(body):
+            return name, subscripts
+        if body[pos] != ",":
+            return None
+        pos += 1
+
+
+def native_value(value):
+    """Convert a Native API global value to what the ObjectScript path puts in JSON."""
+    if value is None:
+        return ""
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).decode("utf-8", errors="replace")
+    if isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+def call_native_global_sync(operation: str, global_ref: str, namespace: str, name: str, subscripts: list,
+                            value: str = None, call=None):
+    """
+    Run get_global ("get") or set_global ("set") on a pooled connection for the namespace.
+    Returns the same JSON response as ExecuteMCP.Core.Command.GetGlobal / SetGlobal with
+    "path": "native", or None when the ObjectScript path should handle the call.
+    A set that fails once it was sent to IRIS is reported as an error rather than
+    repeated through ObjectScript, since it may already have been applied.
+    """
+    pool = get_connection_pool(namespace)
+    access_key = (pool.hostname, pool.port, pool.namespace, pool.username)
+    write_sent = False
+
+    def run(pooled):
+        nonlocal write_sent
+        iris_obj = pooled.iris_obj
+        access = _native_global_access.get(access_key)
+        if access is None or access[0] <= time.monotonic():
+            allowed = str(iris_obj.classMethodValue("%SYSTEM.Security", "Check", "%Development", "USE")) == "1"
+            access = (time.monotonic() + NATIVE_ACCESS_TTL, allowed)
+            _native_global_access[access_key] = access
+        if not access[1]:
+            return {
+                "status": "error",
+                "errorMessage": "Insufficient privileges for global access (requires %Development:USE)"
+            }
+
+        response = {
+            "status": "success",
+            "globalRef": global_ref if global_ref.startswith("^") else "^" + global_ref,
+        }
+        if operation == "set":
+            if write_sent:
+                # run_pooled retries on a broken connection, but the first attempt may have set the node
+                raise ConnectionError("Connection lost after the set was sent")
+            write_sent = True
+            iris_obj.set(value, name, *subscripts)
+            response["setValue"] = value
+            response["verifyValue"] = value
+            response["exists"] = int(iris_obj.isDefined(name, *subscripts))
+        else:
+            exists = int(iris_obj.isDefined(name, *subscripts))
+            response["value"] = native_value(iris_obj.get(name, *subscripts) if exists % 10 else None)
+            response["exists"] = exists
+        response["namespace"] = namespace
+        response["timestamp"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        response["mode"] = f"{operation}_global"
+        response["path"] = "native"
+        return response
+
+    try:
+        response = run_pooled(pool, run, f"{operation} {global_ref}", call=call)
+    except CallCancelledError:
+        raise
+    except Exception as e:
+        if write_sent:
+            logger.error(f"Native global set failed after it was sent: {str(e)}")
+            record_native_global_stat("errorAfterSend")
+            return json.dumps({
+                "status": "error",
+                "errorMessage": f"Set of {global_ref} failed after it was sent to IRIS; the node may or may not be set: {str(e)}",
+                "globalRef": global_ref if global_ref.startswith("^") else "^" + global_ref,
+                "namespace": namespace,
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "mode": "set_global",
+                "path": "native"
+            })
+        # Nothing was written - let the ObjectScript path report the IRIS error in its usual form
+        logger.info(f"Native global {operation} failed, using ObjectScript path: {str(e)}")
+        record_native_global_stat("fallbackError")
+        return None
+
+    record_native_global_stat("native")
+    return json.dumps(response)
+
+
+async def native_global_async(operation: str, global_ref: str, namespace: str, value: str = None,
+                              timeout: float = 10.0):
+    """
+    Try the native path for get_global / set_global under the quick budget.
+    Returns the JSON response, or None when the caller should use the ObjectScript path.
+    """
+    if not (NATIVE_GLOBALS and POOL_ENABLED and IRIS_AVAILABLE):
+        return None
+    parsed = parse_global_ref(global_ref)
+    if parsed is None:
+        record_native_global_stat("fallbackUnparsed")
+        return None
+
+    name, subscripts = parsed
+    work = functools.partial(call_native_global_sync, operation, global_ref, namespace, name, subscripts, value)
+    return await run_iris_async("quick", "^" + name, operation, timeout, work)
+
+
+# =====================================================================================
+# RESULT CACHE
+# =====================================================================================
+
+# Opt-in read-through cache for get_system_info and get_global responses. A cached
+# get_global entry is dropped when set_global / set_globals write the same node, one of
+# its ancestors or one of its descendants (in any namespace, as globals may be mapped),
+# and every get_global entry of a namespace is dropped when a tool that runs arbitrary
+# code there (execute_command, execute_script, execute_classmethod, compiles, unit tests,
+# background jobs while they run, ...) is called.
+# Writes made outside this server are only picked up when the entry's TTL runs out.
+RESULT_CACHE_ENABLED = os.getenv('IRIS_RESULT_CACHE', 'false').lower() in ('1', 'true', 'yes')
+RESULT_CACHE_SIZE = int(os.getenv('IRIS_RESULT_CACHE_SIZE', '1000'))
+RESULT_CACHE_TTLS = {
+    "get_system_info": float(os.getenv('IRIS_CACHE_TTL_SYSTEM_INFO', '60')),
+    "get_global": float(os.getenv('IRIS_CACHE_TTL_GET_GLOBAL', '5')),
+}
+
+# key -> (expires at, cached response JSON), least recently used first. Keys are
+# ("get_system_info",) and ("get_global", namespace, name, cache_subscripts(subscripts)).
+_result_cache = OrderedDict()
+_result_cache_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+# Bumped by every invalidation, so a read that overlapped a write does not store its result
+_result_cache_generation = 0
+
+
+def cache_subscripts(subscripts: list) -> tuple:
+    """
+    Subscripts as used in cache keys. A string subscript in canonical numeric form is the
+    same node as the number (^X("1") is ^X(1)), so it is keyed as an int.
+    """
+    return tuple(int(subscript) if isinstance(subscript, str) and subscript != "-0"
+                 and _INTEGER_SUBSCRIPT_RE.fullmatch(subscript) else subscript
+                 for subscript in subscripts)
+
+
+def result_cache_lookup(key: tuple):
+    """
+    Return (cached JSON or None, generation). Pass the generation to result_cache_store
+    once the uncached call returns.
+    """
+    if not RESULT_CACHE_ENABLED or RESULT_CACHE_TTLS.get(key[0], 0) <= 0:
+        return None, None
+    entry = _result_cache.get(key)
+    if entry is not None:
+        if entry[0] > time.monotonic():
+            _result_cache.move_to_end(key)
+            _result_cache_stats["hits"] += 1
+            return entry[1], _result_cache_generation
+        del _result_cache[key]
+        _result_cache_stats["expirations"] += 1
+    _result_cache_stats["misses"] += 1
+    return None, _result_cache_generation
+
+
+def result_cache_store(key: tuple, generation, result: str):
+    """Cache a successful response unless an invalidation happened since the lookup."""
+    if generation is None or generation != _result_cache_generation:
+        return
+    try:
+        parsed = json.loads(result)
+    except json.JSONDecodeError:
+        return
+    if parsed.get("status") != "success":
+        return
+    parsed["cached"] = True
+    _result_cache[key] = (time.monotonic() + RESULT_CACHE_TTLS[key[0]], json.dumps(parsed))
+    _result_cache.move_to_end(key)
+    _result_cache_stats["stores"] += 1
+    while len(_result_cache) > RESULT_CACHE_SIZE:
+        _result_cache.popitem(last=False)
+        _result_cache_stats["evictions"] += 1
+
+
+def invalidate_cached_globals(namespace: str = None, global_ref: str = None):
+    """
+    Drop cached get_global entries. With a global_ref, only entries for that node, its
+    ancestors and its descendants (in every namespace); otherwise every entry for the
+    namespace, or for all namespaces when namespace is None.
+    """
+    global _result_cache_generation
+    _result_cache_generation += 1
+    if not _result_cache:
+        return
+
+    parsed = parse_global_ref(global_ref) if global_ref is not None else None
+    if global_ref is not None and parsed is None:
+        # Extended reference, indirection, ... - the node cannot be located
+        namespace = None
+
+    stale = []
+    for key in _result_cache:
+        if key[0] != "get_global":
+            continue
+        if parsed is not None:
+            name, subscripts = parsed
+            if key[2] != name:
+                continue
+            subscripts = cache_subscripts(subscripts)
+            common = min(len(subscripts), len(key[3]))
+            if subscripts[:common] != key[3][:common]:
+                continue
+        elif namespace is not None and key[1] != namespace:
+            continue
+        stale.append(key)
+    for key in stale:
+        del _result_cache[key]
+    _result_cache_stats["invalidations"] += len(stale)
+
+
+def get_result_cache_stats() -> dict:
+    """Result cache configuration and counters for get_server_metrics."""
+    return {
+        "enabled": RESULT_CACHE_ENABLED,
+        "maxEntries": RESULT_CACHE_SIZE,
+        "ttls": dict(RESULT_CACHE_TTLS),
+        "entries": len(_result_cache),
+        **_result_cache_stats,
+    }
+
+
+# =====================================================================================
+# READ COALESCING
+# =====================================================================================
+
+# Identical read-only calls (same tool and arguments, including the namespace) that
+# arrive while one is already in flight wait for that call's response instead of making
+# their own IRIS call. Keys carry the cache generation, so a read that starts after a
+# write (or compile) was invalidated never joins a flight that started before it.
+COALESCE_READS = os.getenv('IRIS_COALESCE_READS', 'true').lower() in ('1', 'true', 'yes')
+
+# key -> [future for the leader's response, number of waiting followers]
+_inflight_reads = {}
+_coalesce_stats = {"leaders": 0, "coalesced": 0, "retried": 0}
+_coalesced_by_tool = {}
+
+
+async def coalesce_read(tool: str, key: tuple, call):
+    """
+    Await call() - a coroutine function returning the response JSON - unless an identical
+    read is in flight, in which case await that one's response. A follower whose leader
+    was cancelled makes the call itself.
+    """
+    if not COALESCE_READS:
+        return await call()
+
+    flight_key = (tool,) + key
+    flight = _inflight_reads.get(flight_key)
+    if flight is not None:
+        future = flight[0]
+        flight[1] += 1
+        _coalesce_stats["coalesced"] += 1
+        _coalesced_by_tool[tool] = _coalesced_by_tool.get(tool, 0) + 1
+        start = time.perf_counter()
+        try:
+            # shield: a cancelled follower must not cancel the leader's future
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            _coalesce_stats["retried"] += 1
+            return await coalesce_read(tool, key, call)
+        finally:
+            record_span_phase("coalesced", time.perf_counter() - start)
+
+    future = asyncio.get_running_loop().create_future()
+    flight = [future, 0]
+    _inflight_reads[flight_key] = flight
+    _coalesce_stats["leaders"] += 1
+    try:
+        result = await call()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        if not flight[1]:
+            # Mark the exception retrieved, so asyncio does not log it for a future nobody awaited
+            future.exception()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        if _inflight_reads.get(flight_key) is flight:
+            del _inflight_reads[flight_key]
+
+
+def get_coalesce_stats() -> dict:
+    """Read coalescing counters for get_server_metrics."""
+    return {
+        "enabled": COALESCE_READS,
+        "inFlight": len(_inflight_reads),
+        **_coalesce_stats,
+        "coalescedByTool": dict(_coalesced_by_tool),
+    }
+
+
+@mcp.tool()
+@instrumented
+async def execute_command(command: str, namespace: str = "HSCUSTOM") -> str:
+    """
+    Execute an ObjectScript command directly in IRIS.
+    
+    NOTE: For executing ObjectScript class methods (e.g., ##class(MyClass).MyMethod()),
+    use the execute_classmethod tool instead, which provides better parameter handling,
+    return value capture, and output parameter support.
+    
+    Args:
+        command: The ObjectScript command to execute (WRITE, SET, KILL, etc.)
+        namespace: Optional IRIS namespace (default: HSCUSTOM)
+    
+    Returns:
+        JSON string with execution results
+    """
+    logger.info(f"Executing command in {namespace}: {command}")
+    
+    try:
+        # Call IRIS backend with timeout to prevent FastMCP STDIO blocking
+        result = await call_iris_async("execute", "ExecuteMCP.Core.Command", "ExecuteCommand", 10.0, command, namespace)
+        # The code may have written globals cached in this namespace
+        invalidate_cached_globals(namespace)
+        
+        # Parse result to ensure it's valid JSON
+        parsed_result = parse_iris_result(result)
+        
+        # Log success
+        if parsed_result.get("status") == "success":
+            logger.info("Command executed successfully")
+        else:
+            logger.warning(f"Command execution issues: {parsed_result.get('error', 'Unknown error')}")
+            
+        return result
+        
+    except json.JSONDecodeError as e:
+        error_response = json.dumps({
+            "status": "error", 
+            "error": f"Invalid JSON response from IRIS: {str(e)}",
+            "output": result if 'result' in locals() else "",
+            "namespace": namespace
+        })
+        logger.error(f"JSON decode error: {str(e)}")
+        return error_response
+        
+    except Exception as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Unexpected error: {str(e)}",
+            "output": "",
+            "namespace": namespace
+        })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
+@mcp.tool()
+@instrumented
+async def execute_script(commands: list, namespace: str = "HSCUSTOM", stop_on_error: bool = True) -> str:
+    """
+    Execute an ordered list of ObjectScript commands in a single IRIS call.
+    
+    The commands run one after another in the same process and share local variables,
+    so setup / action / inspect sequences need one round-trip instead of one per command.
+    
+    Args:
+        commands: List of ObjectScript commands (e.g., ["SET x=5", "SET y=x*2", "WRITE y"])
+        namespace: Optional IRIS namespace (default: HSCUSTOM)
+        stop_on_error: Stop at the first failing command and report the rest as skipped
+                       (default: true); when false every command runs
+    
+    Returns:
+        JSON string with per-step status, output and executionTimeMs, plus
+        stepCount / executedCount / failedCount and total execution time
+    """
+    logger.info(f"Executing script of {len(commands) if isinstance(commands, list) else '?'} commands in {namespace}")
+    
+    try:
+        if not isinstance(commands, list) or not all(isinstance(command, str) for command in commands):
+            return json.dumps({
+                "status": "error",
+                "error": "commands must be a list of ObjectScript command strings",
+                "namespace": namespace
+            })
+        
+        # Call IRIS backend with timeout
+        result = await call_iris_async(
+            "execute",
+            "ExecuteMCP.Core.Command",
+            "ExecuteScript",
+            30.0,  # 30 second timeout for the whole script
+            json.dumps(commands),
+            namespace,
+            1 if stop_on_error else 0
+        )
+        # The code may have written globals cached in this namespace
+        invalidate_cached_globals(namespace)
+        
+        # Parse result to ensure it's valid JSON
+        parsed_result = parse_iris_result(result)
+        
+        # Log success
+        if parsed_result.get("status") == "success":
+            logger.info(f"Script executed successfully: {parsed_result.get('executedCount')} commands")
+        else:
+            logger.warning(f"Script execution issues: {parsed_result.get('errorMessage', parsed_result.get('error', 'Unknown error'))}")
+            
+        return result
+        
+    except json.JSONDecodeError as e:
+        error_response = json.dumps({
+            "status": "error", 
+            "error": f"Invalid JSON response from IRIS: {str(e)}",
+            "output": result if 'result' in locals() else "",
+            "namespace": namespace
+        })
+        logger.error(f"JSON decode error: {str(e)}")
+        return error_response
+        
+    except Exception as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Unexpected error: {str(e)}",
+            "namespace": namespace
+        })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
+@mcp.tool()
+@instrumented
+async def get_global(global_ref: str, namespace: str = "HSCUSTOM") -> str:
+    """
+    Get the value of an IRIS global dynamically.
+    
+    Args:
+        global_ref: The global reference (e.g., "^TempGlobal", "^TempGlobal(1,2)", "^TempGlobal(\"This\",\"That\")")
+        namespace: Optional IRIS namespace (default: HSCUSTOM)
+    
+    Returns:
+        JSON string with global value and metadata
+        ("path": "native" when read directly through the Native API)
+    """
+    logger.info(f"Getting global {global_ref} in {namespace}")
+    
+    try:
+        # Only plain nodes are cached - they are the ones writes can be matched against
+        parsed_ref = parse_global_ref(global_ref)
+        cache_key = ("get_global", namespace, parsed_ref[0], cache_subscripts(parsed_ref[1])) if parsed_ref else None
+        cached, generation = result_cache_lookup(cache_key) if cache_key else (None, None)
+        if cached is not None:
+            logger.info(f"Global served from cache: {global_ref}")
+            return cached
+        
+        # Plain global nodes go through the Native API, everything else through ObjectScript
+        async def read():
+            result = await native_global_async("get", global_ref, namespace)
+            if result is None:
+                result = await call_iris_async("quick", "ExecuteMCP.Core.Command", "GetGlobal", 10.0, global_ref, namespace)
+            return result
+        
+        result = await coalesce_read("get_global", (namespace, global_ref, _result_cache_generation), read)
+        if cache_key:
+            result_cache_store(cache_key, generation, result)
+        
+        # Parse result to ensure it's valid JSON
+        parsed_result = parse_iris_result(result)
+        
+        # Log success
+        if parsed_result.get("status") == "success":
+            logger.info(f"Global retrieved successfully: {global_ref}")
+        else:
+            logger.warning(f"Global retrieval issues: {parsed_result.get('errorMessage', 'Unknown error')}")
+            
+        return result
+        
+    except json.JSONDecodeError as e:
+        error_response = json.dumps({
+            "status": "error", 
+            "error": f"Invalid JSON response from IRIS: {str(e)}",
+            "globalRef": global_ref,
+            "namespace": namespace
+        })
+        logger.error(f"JSON decode error: {str(e)}")
+        return error_response
+        
+    except Exception as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Unexpected error: {str(e)}",
+            "globalRef": global_ref,
+            "namespace": namespace
+        })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
+@mcp.tool()
+@instrumented
+async def set_global(global_ref: str, value: str, namespace: str = "HSCUSTOM") -> str:
+    """
+    Set the value of an IRIS global dynamically.
+    
+    Args:
+        global_ref: The global reference (e.g., "^TempGlobal", "^TempGlobal(1,2)", "^TempGlobal(\"This\",\"That\")")
+        value: The value to set
+        namespace: Optional IRIS namespace (default: HSCUSTOM)
+    
+    Returns:
+        JSON string with operation result and verification
+        ("path": "native" when written directly through the Native API)
+    """
+    logger.info(f"Setting global {global_ref} = '{value}' in {namespace}")
+    
+    try:
+        # Plain global nodes go through the Native API, everything else through ObjectScript
+        result = await native_global_async("set", global_ref, namespace, value)
+        if result is None:
+            result = await call_iris_async("quick", "ExecuteMCP.Core.Command", "SetGlobal", 10.0, global_ref, value, namespace)
+        invalidate_cached_globals(namespace, global_ref)
+        
+        # Parse result to ensure it's valid JSON
+        parsed_result = parse_iris_result(result)
+        
+        # Log success
+        if parsed_result.get("status") == "success":
+            logger.info(f"Global set successfully: {global_ref}")
+        else:
+            logger.warning(f"Global set issues: {parsed_result.get('errorMessage', 'Unknown error')}")
+            
+        return result
+        
+    except json.JSONDecodeError as e:
+        error_response = json.dumps({
+            "status": "error", 
+            "error": f"Invalid JSON response from IRIS: {str(e)}",
+            "globalRef": global_ref,
+            "namespace": namespace
+        })
+        logger.error(f"JSON decode error: {str(e)}")
+        return error_response
+        
+    except Exception as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Unexpected error: {str(e)}",
+            "globalRef": global_ref,
+            "namespace": namespace
+        })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
+@mcp.tool()
+@instrumented
+async def get_globals(global_refs: list, namespace: str = "HSCUSTOM") -> str:
+    """
+    Get the values of many IRIS globals in a single round-trip.
+    
+    Args:
+        global_refs: List of global references (e.g., ["^Config(\"A\")", "^Config(\"B\")", "^Counter"])
+        namespace: Optional IRIS namespace (default: HSCUSTOM)
+    
+    Returns:
+        JSON string with per-item results (globalRef, value, exists, status) in request order
+    """
+    logger.info(f"Getting {len(global_refs)} globals in {namespace}")
+    
+    try:
+        # Call IRIS backend once for the whole batch
+        refs_json = json.dumps(global_refs)
+        result = await coalesce_read(
+            "get_globals",
+            (namespace, refs_json, _result_cache_generation),
+            lambda: call_iris_async("quick", "ExecuteMCP.Core.Command", "GetGlobals", 10.0, refs_json, namespace)
+        )
+        
+        # Parse result to ensure it's valid JSON
+        parsed_result = parse_iris_result(result)
+        
+        # Log success
+        if parsed_result.get("status") == "success":
+            logger.info(f"Globals retrieved successfully: {parsed_result.get('count', 0)} items")
+        else:
+            logger.warning(f"Global batch retrieval issues: {parsed_result.get('errorCount', parsed_result.get('errorMessage', 'Unknown error'))}")
+            
+        return result
+        
+    except json.JSONDecodeError as e:
+        error_response = json.dumps({
+            "status": "error", 
+            "error": f"Invalid JSON response from IRIS: {str(e)}",
+            "globalRefs": global_refs,
+            "namespace": namespace
+        })
+        logger.error(f"JSON decode error: {str(e)}")
+        return error_response
+        
+    except Exception as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Unexpected error: {str(e)}",
+            "globalRefs": global_refs,
+            "namespace": namespace
+        })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
+@mcp.tool()
+@instrumented
+async def set_globals(items: list, namespace: str = "HSCUSTOM", transactional: bool = False) -> str:
+    """
+    Set the values of many IRIS globals in a single round-trip.
+    
+    Args:
+        items: List of objects, each with:
+            - globalRef: The global reference (e.g., "^Config(\"A\")")
+            - value: The value to set
+        namespace: Optional IRIS namespace (default: HSCUSTOM)
+        transactional: Apply all items in one transaction, rolling back every item
+                       if any fails (default: false)
+    
+    Returns:
+        JSON string with per-item results (globalRef, setValue, status) in request order
+    """
+    logger.info(f"Setting {len(items)} globals in {namespace} (transactional={transactional})")
+    
+    try:
+        # Call IRIS backend once for the whole batch
+        result = await call_iris_async(
+            "quick",
+            "ExecuteMCP.Core.Command",
+            "SetGlobals",
+            10.0,
+            json.dumps(items),
+            namespace,
+            1 if transactional else 0
+        )
+        for item in items:
+            invalidate_cached_globals(namespace, item.get("globalRef", "") if isinstance(item, dict) else None)
+        
+        # Parse result to ensure it's valid JSON
+        parsed_result = parse_iris_result(result)
+        
+        # Log success
+        if parsed_result.get("status") == "success":
+            logger.info(f"Globals set successfully: {parsed_result.get('count', 0)} items")
+        else:
+            logger.warning(f"Global batch set issues: {parsed_result.get('errorCount', parsed_result.get('errorMessage', 'Unknown error'))}")
+            
+        return result
+        
+    except json.JSONDecodeError as e:
+        error_response = json.dumps({
+            "status": "error", 
+            "error": f"Invalid JSON response from IRIS: {str(e)}",
+            "itemCount": len(items),
+            "namespace": namespace
+        })
+        logger.error(f"JSON decode error: {str(e)}")
+        return error_response
+        
+    except Exception as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Unexpected error: {str(e)}",
+            "itemCount": len(items),
+            "namespace": namespace
+        })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
+@mcp.tool()
+@instrumented
+async def list_global(
+    global_ref: str,
+    cursor: str = "",
+    max_nodes: int = 100,
+    max_bytes: int = 65536,
+    max_depth: int = 0,
+    namespace: str = "HSCUSTOM"
+) -> str:
+    """
+    List the nodes of an IRIS global subtree one page at a time.
+    
+    Args:
+        global_ref: Root of the subtree (e.g., "^MyApp", "^MyApp(\"Config\")")
+        cursor: Cursor from the previous page to resume after its last node (default: first page)
+        max_nodes: Maximum nodes per page (default: 100)
+        max_bytes: Approximate maximum page size in bytes (default: 65536)
+        max_depth: Maximum subscript levels below the root, 0 for unlimited (default: 0).
+                   Deeper nodes are summarised by their ancestor at the limit.
+        namespace: Optional IRIS namespace (default: HSCUSTOM)
+    
+    Returns:
+        JSON string with nodes (ref, subscripts, value, data), hasMore and the cursor for the next page
+    """
+    logger.info(f"Listing global {global_ref} in {namespace} (cursor: {cursor or 'start'})")
+    
+    try:
+        # Call IRIS backend, sharing the response with identical pages requested meanwhile
+        result = await coalesce_read(
+            "list_global",
+            (namespace, global_ref, cursor, max_nodes, max_bytes, max_depth, _result_cache_generation),
+            lambda: call_iris_async(
+                "quick",
+                "ExecuteMCP.Core.Command",
+                "ListGlobal",
+                10.0,
+                global_ref,
+                cursor,
+                max_nodes,
+                max_bytes,
+                max_depth,
+                namespace
+            )
+        )
+        
+        # Parse result to ensure it's valid JSON
+        parsed_result = parse_iris_result(result)
+        
+        # Log success
+        if parsed_result.get("status") == "success":
+            logger.info(f"Global page listed: {parsed_result.get('count', 0)} nodes, hasMore={parsed_result.get('hasMore')}")
+        else:
+            logger.warning(f"Global listing issues: {parsed_result.get('errorMessage', 'Unknown error')}")
+            
+        return result
+        
+    except json.JSONDecodeError as e:
+        error_response = json.dumps({
+            "status": "error", 
+            "error": f"Invalid JSON response from IRIS: {str(e)}",
+            "globalRef": global_ref,
+            "namespace": namespace
+        })
+        logger.error(f"JSON decode error: {str(e)}")
+        return error_response
+        
+    except Exception as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Unexpected error: {str(e)}",
+            "globalRef": global_ref,
+            "namespace": namespace
+        })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
+@mcp.tool()
+@instrumented
+async def get_system_info() -> str:
+    """
+    Get IRIS system information for connectivity testing.
+    
+    Returns:
+        JSON string with system information
+    """
+    logger.info("Getting IRIS system information")
+    
+    try:
+        cached, generation = result_cache_lookup(("get_system_info",))
+        if cached is not None:
+            logger.info("System info served from cache")
+            return cached
+        
+        result = await coalesce_read(
+            "get_system_info",
+            (),
+            lambda: call_iris_async("quick", "ExecuteMCP.Core.Command", "GetSystemInfo", 10.0)
+        )
+        result_cache_store(("get_system_info",), generation, result)
+        logger.info("System info retrieved successfully")
+        return result
+        
+    except Exception as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"System info retrieval failed: {str(e)}",
+            "output": "",
+            "namespace": "N/A"
+        })
+        logger.error(f"System info error: {str(e)}")
+        return error_response
+
+@mcp.tool()
+@instrumented
+async def execute_classmethod(
+    class_name: str, 
+    method_name: str, 
+    parameters: list = None, 
+    namespace: str = "HSCUSTOM"
+) -> str:
+    """
+    Execute an ObjectScript class method dynamically with support for output parameters.
+    
+    Args:
+        class_name: The ObjectScript class name (e.g., "MyPackage.MyClass")
+        method_name: The method name to invoke
+        parameters: Optional list of parameter objects, each with:
+            - value: The parameter value (omit to use the method's default)
+            - isOutput: Whether to report this parameter's value after the call (default: false;
+              arguments declared Output are always reported)
+            - type: Optional type hint overriding the declared type (integer, number, boolean,
+              object, array, string or a class name)
+        namespace: Optional IRIS namespace (default: HSCUSTOM)
+    
+    Returns:
+        JSON string with method result, output parameters, any captured output and
+        timings (setupMs, signatureMs, prepareMs, captureMs, executeMs, totalMs) and signatureCached
+    """
+    logger.info(f"Executing class method {class_name}.{method_name} in {namespace}")
+    
+    try:
+        # Default to empty list if no parameters provided
+        if parameters is None:
+            parameters = []
+            
+        # Convert parameters list to JSON string for IRIS
+        parameters_json = json.dumps(parameters)
+        
+        # Call IRIS backend with timeout
+        result = await call_iris_async(
+            "execute",
+            "ExecuteMCP.Core.Command", 
+            "ExecuteClassMethod", 
+            30.0,  # 30 second timeout for class methods
+            class_name, 
+            method_name, 
+            parameters_json, 
+            namespace
+        )
+        # The code may have written globals cached in this namespace
+        invalidate_cached_globals(namespace)
+        
+        # Parse result to ensure it's valid JSON
+        parsed_result = parse_iris_result(result)
+        
+        # Log success
+        if parsed_result.get("status") == "success":
+            logger.info(f"Class method executed successfully: {class_name}.{method_name}")
+        else:
+            logger.warning(f"Class method execution issues: {parsed_result.get('errorMessage', 'Unknown error')}")
+            
+        return result
+        
+    except json.JSONDecodeError as e:
+        error_response = json.dumps({
+            "status": "error", 
+            "error": f"Invalid JSON response from IRIS: {str(e)}",
+            "className": class_name,
+            "methodName": method_name,
+            "namespace": namespace
+        })
+        logger.error(f"JSON decode error: {str(e)}")
+        return error_response
+        
+    except Exception as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Unexpected error: {str(e)}",
+            "className": class_name,
+            "methodName": method_name,
+            "namespace": namespace
+        })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
+
+@mcp.tool()
+@instrumented
+async def profile_classmethod(
+    class_name: str,
+    method_name: str,
+    parameters: list = None,
+    namespace: str = "HSCUSTOM",
+    top_n: int = 20,
+    routines: str = ""
+) -> str:
     """
-    Call IRIS with explicit timeout to prevent FastMCP STDIO blocking.
-    Uses ThreadPoolExecutor to ensure response delivery.
+    Execute an ObjectScript class method under the line-by-line monitor and report its hottest lines.
+    
+    The method is invoked exactly like execute_classmethod while %Monitor.System.LineByLine
+    collects per-line counters for the class's routines in the calling process.
+    
+    Args:
+        class_name: The ObjectScript class name (e.g., "MyPackage.MyClass")
+        method_name: The method name to invoke
+        parameters: Optional list of parameter objects, as for execute_classmethod
+        namespace: Optional IRIS namespace (default: HSCUSTOM)
+        top_n: Number of lines to report, ordered by time spent on the line (default: 20)
+        routines: Optional comma-separated extra routines to monitor (e.g., "MyPackage.Util.*")
+    
+    Returns:
+        JSON string with the execute_classmethod result as call, lines (routine, line, source,
+        linesExecuted, globalRefs, timeMs, totalTimeMs), totals over all monitored lines and timings
     """
-    logger.info(f"Starting IRIS call with {timeout}s timeout: {class_name}.{method_name}")
+    logger.info(f"Profiling class method {class_name}.{method_name} in {namespace}")
     
     try:
-        # Submit to thread pool with timeout
-        future = executor.submit(call_iris_sync, class_name, method_name, *args)
-        result = future.result(timeout=timeout)
-        logger.info(f"IRIS call completed within timeout: {class_name}.{method_name}")
+        if parameters is None:
+            parameters = []
+        
+        result = await call_iris_async(
+            "profile",
+            "ExecuteMCP.Core.Profiler",
+            "ProfileClassMethod",
+            60.0,  # 60 second timeout - monitoring slows the method down
+            class_name,
+            method_name,
+            json.dumps(parameters),
+            namespace,
+            max(1, top_n),
+            routines
+        )
+        # The code may have written globals cached in this namespace
+        invalidate_cached_globals(namespace)
+        
+        parsed_result = parse_iris_result(result)
+        
+        if parsed_result.get("status") == "success":
+            logger.info(f"Profiled {class_name}.{method_name}: {len(parsed_result.get('lines', []))} lines reported")
+        else:
+            logger.warning(f"Profiling issues: {parsed_result.get('errorMessage', 'Unknown error')}")
+        
         return result
         
-    except TimeoutError:
-        error_msg = f"IRIS call timed out after {timeout}s: {class_name}.{method_name}"
-        logger.error(error_msg)
-        return json.dumps({
+    except json.JSONDecodeError as e:
+        error_response = json.dumps({
             "status": "error",
-            "error": error_msg,
-            "output": "",
-            "namespace": "N/A",
-            "timeout": timeout
+            "error": f"Invalid JSON response from IRIS: {str(e)}",
+            "className": class_name,
+            "methodName": method_name,
+            "namespace": namespace
         })
+        logger.error(f"JSON decode error: {str(e)}")
+        return error_response
+        
     except Exception as e:
-        error_msg = f"IRIS call failed: {str(e)}"
-        logger.error(error_msg)
-        return json.dumps({
+        error_response = json.dumps({
             "status": "error",
-            "error": error_msg,
-            "output": "",
-            "namespace": "N/A"
+            "error": f"Unexpected error: {str(e)}",
+            "className": class_name,
+            "methodName": method_name,
+            "namespace": namespace
         })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
+
+# =====================================================================================
+# SQL TOOLS - PAGED QUERIES WITH SERVER-SIDE CURSORS
+# =====================================================================================
+
+# An open cursor lives in the IRIS process that executed the query, so the connection
+# it was opened on is taken out of the pool and pinned to the cursor until the last
+# page is fetched, close_sql is called or the cursor has been idle for the TTL
+SQL_PAGE_SIZE = int(os.getenv('IRIS_SQL_PAGE_SIZE', '500'))
+SQL_CURSOR_TTL = float(os.getenv('IRIS_SQL_CURSOR_TTL', '300'))
+SQL_MAX_CURSORS = int(os.getenv('IRIS_SQL_MAX_CURSORS', '4'))
 
-def call_iris_sync(class_name: str, method_name: str, *args):
+_sql_cursor_ids = itertools.count(1)
+_sql_cursors = {}
+_sql_cursors_lock = threading.Lock()
+_sql_cursors_pending = 0  # Execute calls that may still open a cursor
+_sql_stats = {"opened": 0, "exhausted": 0, "closed": 0, "expired": 0, "broken": 0, "rejected": 0}
+
+
+class SqlCursor:
+    """An open server-side cursor and the pooled connection (IRIS process) holding it."""
+
+    def __init__(self, cursor_id: str, pool: ConnectionPool, pooled: PooledConnection, namespace: str):
+        self.cursor_id = cursor_id
+        self.pool = pool
+        self.pooled = pooled
+        self.namespace = namespace
+        self.opened_at = time.monotonic()
+        self.last_used = self.opened_at
+        # One call at a time on the pinned connection
+        self.lock = threading.Lock()
+
+    def describe(self) -> dict:
+        now = time.monotonic()
+        return {
+            "cursorId": self.cursor_id,
+            "namespace": self.namespace,
+            "serverJob": self.pooled.server_job,
+            "ageSeconds": round(now - self.opened_at, 3),
+            "idleSeconds": round(now - self.last_used, 3),
+        }
+
+
+def get_sql_stats() -> dict:
+    """Cursor counters and the cursors currently open, for get_server_metrics."""
+    with _sql_cursors_lock:
+        stats = dict(_sql_stats)
+        cursors = list(_sql_cursors.values())
+    stats["maxCursors"] = SQL_MAX_CURSORS
+    stats["ttl"] = SQL_CURSOR_TTL
+    stats["open"] = [cursor.describe() for cursor in cursors]
+    return stats
+
+
+def release_sql_cursor(cursor: SqlCursor, reason: str, close: bool = False, discard: bool = False):
     """
-    Synchronous IRIS class method call.
-    Returns JSON string response from IRIS.
+    Unregister a cursor and return its connection to the pool, optionally closing the
+    cursor on the server first. Caller must hold cursor.lock.
     """
-    if not IRIS_AVAILABLE:
+    with _sql_cursors_lock:
+        if _sql_cursors.get(cursor.cursor_id) is cursor:
+            del _sql_cursors[cursor.cursor_id]
+        _sql_stats[reason] += 1
+    if close and not discard:
+        try:
+            cursor.pooled.iris_obj.classMethodString("ExecuteMCP.Core.SQL", "Close", cursor.cursor_id)
+        except Exception as e:
+            logger.warning(f"Could not close SQL cursor {cursor.cursor_id}: {str(e)}")
+            discard = True
+    cursor.pool.release(cursor.pooled, discard=discard, reset=True)
+
+
+def expire_sql_cursors():
+    """Close cursors idle for longer than SQL_CURSOR_TTL that no call is using."""
+    deadline = time.monotonic() - SQL_CURSOR_TTL
+    with _sql_cursors_lock:
+        idle = [cursor for cursor in _sql_cursors.values() if cursor.last_used < deadline]
+    for cursor in idle:
+        if cursor.lock.acquire(blocking=False):
+            try:
+                if cursor.last_used < deadline:
+                    logger.info(f"Closing SQL cursor {cursor.cursor_id} idle for more than {SQL_CURSOR_TTL}s")
+                    release_sql_cursor(cursor, "expired", close=True)
+            finally:
+                cursor.lock.release()
+
+
+def call_sql_on(pooled: PooledConnection, method_name: str, *args, call=None) -> str:
+    """Call an ExecuteMCP.Core.SQL method on a specific connection, attached to the in-flight call."""
+    if call is not None and not call.attach(pooled):
+        raise CallCancelledError(f"Call cancelled before execution: ExecuteMCP.Core.SQL.{method_name}")
+    rpc_start = time.perf_counter()
+    try:
+        return pooled.iris_obj.classMethodString("ExecuteMCP.Core.SQL", method_name, *args)
+    finally:
+        record_span_phase("rpc", time.perf_counter() - rpc_start)
+        if call is not None:
+            call.detach()
+
+
+def call_sql_execute_sync(sql: str, parameters_json: str, namespace: str, page_size: int, call=None) -> str:
+    """
+    Run ExecuteMCP.Core.SQL.Execute on a pooled connection. When rows remain, the
+    connection stays checked out and is registered under the returned cursorId.
+    """
+    expire_sql_cursors()
+
+    if not POOL_ENABLED:
+        # Without a pool there is no connection to keep the cursor on - first page only
+        return call_iris_sync("ExecuteMCP.Core.SQL", "Execute", sql, parameters_json, namespace,
+                              page_size, "", call=call)
+
+    global _sql_cursors_pending
+    with _sql_cursors_lock:
+        if len(_sql_cursors) + _sql_cursors_pending >= SQL_MAX_CURSORS:
+            _sql_stats["rejected"] += 1
+            return json.dumps({
+                "status": "error",
+                "errorMessage": f"Too many open SQL cursors (max {SQL_MAX_CURSORS}); "
+                                f"fetch them to the end or close them with close_sql",
+                "openCursors": list(_sql_cursors),
+                "namespace": namespace
+            })
+        _sql_cursors_pending += 1
+    cursor_id = f"sql{next(_sql_cursor_ids)}"
+
+    try:
+        pool = get_connection_pool()
+        checkout_start = time.perf_counter()
+        pooled = pool.acquire()
+        record_span_phase("checkout", time.perf_counter() - checkout_start)
+        try:
+            result = call_sql_on(pooled, "Execute", sql, parameters_json, namespace, page_size, cursor_id,
+                                 int(SQL_CURSOR_TTL), call=call)
+            response = json.loads(result)
+        except Exception as e:
+            pool.release(pooled, discard=is_connection_error(e, pooled) or (call is not None and call.cancelled),
+                         reset=True)
+            raise
+
+        if response.get("cursorId") != cursor_id:
+            pool.release(pooled, reset=True)
+            return result
+
+        with _sql_cursors_lock:
+            _sql_cursors[cursor_id] = SqlCursor(cursor_id, pool, pooled, namespace)
+            _sql_stats["opened"] += 1
+        logger.info(f"SQL cursor {cursor_id} open on IRIS process {pooled.server_job}")
+        return result
+    finally:
+        with _sql_cursors_lock:
+            _sql_cursors_pending -= 1
+
+
+def call_sql_fetch_sync(cursor_id: str, page_size: int, call=None) -> str:
+    """Fetch the next page of an open cursor on the connection it is pinned to."""
+    expire_sql_cursors()
+
+    with _sql_cursors_lock:
+        cursor = _sql_cursors.get(cursor_id)
+    if cursor is None:
         return json.dumps({
             "status": "error",
-            "error": "IRIS not available - intersystems-irispython not installed",
-            "output": "",
-            "namespace": "N/A"
+            "errorMessage": f"Unknown or expired cursor: {cursor_id}",
+            "cursorId": cursor_id
         })
+
+    with cursor.lock:
+        if _sql_cursors.get(cursor_id) is not cursor:
+            return json.dumps({
+                "status": "error",
+                "errorMessage": f"Unknown or expired cursor: {cursor_id}",
+                "cursorId": cursor_id
+            })
+        try:
+            result = call_sql_on(cursor.pooled, "Fetch", cursor_id, page_size, call=call)
+            response = json.loads(result)
+        except Exception:
+            # The cursor died with its process or connection
+            release_sql_cursor(cursor, "broken", discard=True)
+            raise
+        cursor.last_used = time.monotonic()
+        if response.get("cursorId") != cursor_id:
+            # Last page returned, or the fetch failed and IRIS dropped the cursor
+            release_sql_cursor(cursor, "exhausted" if response.get("status") == "success" else "broken")
+        return result
+
+
+def call_sql_close_sync(cursor_id: str, call=None) -> str:
+    """Close an open cursor and return its connection to the pool."""
+    with _sql_cursors_lock:
+        cursor = _sql_cursors.get(cursor_id)
+    closed = False
+    if cursor is not None:
+        with cursor.lock:
+            if _sql_cursors.get(cursor_id) is cursor:
+                release_sql_cursor(cursor, "closed", close=True)
+                closed = True
+    return json.dumps({
+        "status": "success",
+        "closed": closed,
+        "cursorId": cursor_id,
+        "mode": "close_sql",
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+    })
+
+
+@mcp.tool()
+@instrumented
+async def execute_sql(sql: str, parameters: list = None, namespace: str = "HSCUSTOM", page_size: int = None) -> str:
+    """
+    Execute an SQL statement in IRIS and return the first page of its rows.
+    
+    Results are compact: column names once, then one array of values per row (ODBC
+    display format). When more rows remain the response has hasMore=true and a cursorId;
+    pass it to fetch_sql for the next page, or to close_sql when done. Idle cursors are
+    closed automatically after IRIS_SQL_CURSOR_TTL seconds.
+    
+    Args:
+        sql: The SQL statement, with ? placeholders for parameters
+        parameters: Optional list of values bound to the ? placeholders in order
+        namespace: Optional IRIS namespace (default: HSCUSTOM)
+        page_size: Rows per page (default: IRIS_SQL_PAGE_SIZE, max 5000)
+    
+    Returns:
+        JSON string with columns, rows, rowCount, hasMore, cursorId (when rows remain),
+        statementCached and timings; non-SELECT statements report rowCount only
+    """
+    logger.info(f"Executing SQL in {namespace}: {sql[:200]}")
     
     try:
-        # IRIS connection parameters from environment
-        hostname = os.getenv('IRIS_HOSTNAME', 'localhost')
-        port = int(os.getenv('IRIS_PORT', '1972'))
-        namespace = os.getenv('IRIS_NAMESPACE', 'HSCUSTOM')
-        username = os.getenv('IRIS_USERNAME', '_SYSTEM')
-        password = os.getenv('IRIS_PASSWORD', '_SYSTEM')
+        if parameters is None:
+            parameters = []
         
-        # Connect to IRIS
-        conn = iris.connect(hostname, port, namespace, username, password)
-        iris_obj = iris.createIRIS(conn)
+        work = functools.partial(call_sql_execute_sync, sql, json.dumps(parameters), namespace,
+                                 page_size or SQL_PAGE_SIZE)
+        result = await run_iris_async("execute", "ExecuteMCP.Core.SQL", "Execute", 60.0, work)
+        # Triggers, stored procedures and DML write globals
+        invalidate_cached_globals(namespace)
         
-        # Call the class method
-        result = iris_obj.classMethodString(class_name, method_name, *args)
+        parsed_result = parse_iris_result(result)
         
-        # Close connection
-        conn.close()
+        if parsed_result.get("status") == "success":
+            logger.info(f"SQL executed: {parsed_result.get('rowCount', 0)} rows, "
+                        f"hasMore={parsed_result.get('hasMore', False)}")
+        else:
+            logger.warning(f"SQL execution issues: {parsed_result.get('errorMessage', 'Unknown error')}")
         
-        logger.info(f"IRIS call successful: {class_name}.{method_name}")
         return result
         
+    except json.JSONDecodeError as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Invalid JSON response from IRIS: {str(e)}",
+            "namespace": namespace
+        })
+        logger.error(f"JSON decode error: {str(e)}")
+        return error_response
+        
     except Exception as e:
-        error_msg = f"IRIS call failed: {str(e)}"
-        logger.error(error_msg)
-        return json.dumps({
+        error_response = json.dumps({
             "status": "error",
-            "error": error_msg,
-            "output": "",
-            "namespace": "N/A"
+            "error": f"Unexpected error: {str(e)}",
+            "namespace": namespace
         })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
 
 @mcp.tool()
-def execute_command(command: str, namespace: str = "HSCUSTOM") -> str:
+@instrumented
+async def fetch_sql(cursor_id: str, page_size: int = None) -> str:
     """
-    Execute an ObjectScript command directly in IRIS.
+    Fetch the next page of rows from a cursor returned by execute_sql.
     
-    NOTE: For executing ObjectScript class methods (e.g., ##class(MyClass).MyMethod()),
-    use the execute_classmethod tool instead, which provides better parameter handling,
-    return value capture, and output parameter support.
+    The cursor is closed automatically after its last page (hasMore=false).
     
     Args:
-        command: The ObjectScript command to execute (WRITE, SET, KILL, etc.)
-        namespace: Optional IRIS namespace (default: HSCUSTOM)
+        cursor_id: The cursorId from execute_sql or the previous fetch_sql
+        page_size: Rows per page (default: IRIS_SQL_PAGE_SIZE, max 5000)
     
     Returns:
-        JSON string with execution results
+        JSON string with rows, rowCount, rowsFetched (total so far), hasMore and
+        cursorId while rows remain
     """
-    logger.info(f"Executing command in {namespace}: {command}")
+    logger.info(f"Fetching from SQL cursor {cursor_id}")
     
     try:
-        # Call IRIS backend with timeout to prevent FastMCP STDIO blocking
-        result = call_iris_with_timeout("ExecuteMCP.Core.Command", "ExecuteCommand", 10.0, command, namespace)
+        work = functools.partial(call_sql_fetch_sync, cursor_id, page_size or SQL_PAGE_SIZE)
+        result = await run_iris_async("execute", "ExecuteMCP.Core.SQL", "Fetch", 60.0, work)
         
-        # Parse result to ensure it's valid JSON
-        parsed_result = json.loads(result)
+        parsed_result = parse_iris_result(result)
         
-        # Log success
         if parsed_result.get("status") == "success":
-            logger.info("Command executed successfully")
+            logger.info(f"Fetched {parsed_result.get('rowCount', 0)} rows from {cursor_id}")
         else:
-            logger.warning(f"Command execution issues: {parsed_result.get('error', 'Unknown error')}")
-            
+            logger.warning(f"SQL fetch issues: {parsed_result.get('errorMessage', 'Unknown error')}")
+        
         return result
         
     except json.JSONDecodeError as e:
         error_response = json.dumps({
-            "status": "error", 
+            "status": "error",
             "error": f"Invalid JSON response from IRIS: {str(e)}",
-            "output": result if 'result' in locals() else "",
-            "namespace": namespace
+            "cursorId": cursor_id
         })
         logger.error(f"JSON decode error: {str(e)}")
         return error_response
@@ -160,46 +2393,164 @@ def execute_command(command: str, namespace: str = "HSCUSTOM") -> str:
         error_response = json.dumps({
             "status": "error",
             "error": f"Unexpected error: {str(e)}",
-            "output": "",
-            "namespace": namespace
+            "cursorId": cursor_id
         })
         logger.error(f"Unexpected error: {str(e)}")
         return error_response
 
+
 @mcp.tool()
-def get_global(global_ref: str, namespace: str = "HSCUSTOM") -> str:
+@instrumented
+async def close_sql(cursor_id: str) -> str:
     """
-    Get the value of an IRIS global dynamically.
+    Close a cursor returned by execute_sql before fetching all of its rows.
     
     Args:
-        global_ref: The global reference (e.g., "^TempGlobal", "^TempGlobal(1,2)", "^TempGlobal(\"This\",\"That\")")
+        cursor_id: The cursorId to close
+    
+    Returns:
+        JSON string with closed=true if the cursor was still open
+    """
+    logger.info(f"Closing SQL cursor {cursor_id}")
+    
+    try:
+        work = functools.partial(call_sql_close_sync, cursor_id)
+        return await run_iris_async("quick", "ExecuteMCP.Core.SQL", "Close", 10.0, work)
+        
+    except Exception as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Unexpected error: {str(e)}",
+            "cursorId": cursor_id
+        })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
+
+# =====================================================================================
+# CUSTOM TESTRUNNER TOOL - RENAMED FROM run_custom_testrunner TO execute_unit_tests
+# =====================================================================================
+
+# Test runs return the summary plus the selected tests within this many bytes of test
+# records; every record stays pageable in IRIS through get_test_results
+TEST_RESULTS_MAX_BYTES = int(os.getenv('IRIS_TEST_RESULTS_MAX_BYTES', '65536'))
+TEST_RESULT_DETAILS = ("failures", "all", "none")
+
+
+@mcp.tool()
+@instrumented
+async def execute_unit_tests(test_spec: str, namespace: str = "HSCUSTOM", workers: int = 1,
+                             affected: bool = False, since_marker: int = 0, isolate: bool = False,
+                             detail: str = "failures", max_bytes: int = TEST_RESULTS_MAX_BYTES) -> str:
+    """
+    Execute unit tests using the custom ExecuteMCP.TestRunner.
+    
+    Uses DirectTestRunner which bypasses complex %UnitTest.Manager infrastructure
+    to avoid timeout issues while maintaining assertion compatibility.
+    
+    Args:
+        test_spec: Test specification (package, class, or class:method)
+                   Examples:
+                   - "ExecuteMCP.Test" (run all tests in package)
+                   - "ExecuteMCP.Test.SampleUnitTest" (run all methods in class)
+                   - "ExecuteMCP.Test.SampleUnitTest:TestAddition" (run specific method)
         namespace: Optional IRIS namespace (default: HSCUSTOM)
+        workers: Number of IRIS background jobs to split the test classes across (test methods
+                 with isolate), in shards of roughly equal duration predicted from earlier runs
+                 (default: 1, serial)
+        affected: Run only the test classes within test_spec that depend on classes compiled
+                  since since_marker - through superclasses, property, argument and return
+                  types or ##class() calls (default: False)
+        since_marker: compileMarker returned by an earlier compile; changes after it count.
+                      0 means the classes of the last compile (default: 0)
+        isolate: Give every test method its own test case instance and its own
+                 OnBeforeAllTests/OnAfterAllTests (default: False - one instance per class,
+                 OnBeforeAllTests once, OnBeforeOneTest/OnAfterOneTest around each method)
+        detail: Tests listed in the response - "failures" (failed and error, default),
+                "all" or "none"; every test can be paged afterwards with get_test_results
+        max_bytes: Cap on the test records in the response (default: IRIS_TEST_RESULTS_MAX_BYTES,
+                   0 = no cap); tests beyond it are counted in results.omitted and truncated is true
+    
+    Test methods run in an order planned from the run history (see get_test_history):
+    tests that failed last time first, then new tests, then the rest, fastest first,
+    keeping the methods of a class together.
     
     Returns:
-        JSON string with global value and metadata
+        JSON string with complete test results including:
+        - summary: Overall test statistics (passed, failed, errors, skipped)
+        - tests: Results of the tests selected by detail, in the planned order
+        - results: runId for get_test_results, records written, returned and omitted counts
+        - truncated: True when max_bytes cut tests from the response
+        - executionTime: Total time taken (including discovery)
+        - discoveryTime / discoveryIndex: Time spent resolving tests, and index entries reused / rebuilt
+        - plan: Order, shard count, tests with history (knownTests) and predicted ms per shard
+        - parallel: Worker count, predicted vs actual ms per shard and per-worker timings (when workers > 1)
+        - lifecycle: Mode, instances created and setup / test / teardown ms, in total and per class
+        - affected: Changed classes, selected vs total test classes and tests (affected mode)
+        - status: Overall execution status
     """
-    logger.info(f"Getting global {global_ref} in {namespace}")
+    logger.info(f"Running DirectTestRunner for: {test_spec} in namespace {namespace} with {workers} worker(s)"
+                f"{' (affected tests only)' if affected else ''}")
+    
+    if detail not in TEST_RESULT_DETAILS:
+        return json.dumps({
+            "status": "error",
+            "error": f"Invalid detail '{detail}' (expected one of: {', '.join(TEST_RESULT_DETAILS)})",
+            "testSpec": test_spec,
+            "namespace": namespace
+        })
     
     try:
-        # Call IRIS backend
-        result = call_iris_sync("ExecuteMCP.Core.Command", "GetGlobal", global_ref, namespace)
+        # Call DirectTestRunner.RunTests with the test spec directly
+        # DirectTestRunner handles all the complex object creation internally
+        logger.info("Calling DirectTestRunner.RunTests")
+        result = await call_iris_async(
+            "test",
+            "ExecuteMCP.Core.DirectTestRunner",
+            "RunTests",  # Correct method name
+            30.0,  # 30 second timeout for test execution
+            test_spec,
+            namespace,
+            max(1, workers),
+            1 if affected else 0,
+            max(0, since_marker),
+            1 if isolate else 0,
+            detail,
+            max(0, max_bytes)
+        )
+        # The code may have written globals cached in this namespace
+        invalidate_cached_globals(namespace)
         
         # Parse result to ensure it's valid JSON
-        parsed_result = json.loads(result)
+        parsed_result = parse_iris_result(result)
         
-        # Log success
-        if parsed_result.get("status") == "success":
-            logger.info(f"Global retrieved successfully: {global_ref}")
+        # Log test execution status
+        status = parsed_result.get("status", "unknown")
+        if status == "success":
+            summary = parsed_result.get("summary", {})
+            total = summary.get("total", 0)
+            passed = summary.get("passed", 0)
+            failed = summary.get("failed", 0)
+            errors = summary.get("errors", 0)
+            logger.info(f"TestRunner completed: {passed}/{total} passed, {failed} failed, {errors} errors"
+                        f" (run {parsed_result.get('results', {}).get('runId')})")
+            if parsed_result.get("truncated"):
+                logger.info(f"Test results truncated: {parsed_result['results'].get('omitted', 0)} omitted")
+            if affected:
+                selection = parsed_result.get("affected", {})
+                logger.info(f"Affected tests selected: {selection.get('selectedTests', 0)}/{selection.get('totalTests', 0)}")
+        elif status == "error":
+            logger.error(f"TestRunner execution failed: {parsed_result.get('error', 'Unknown error')}")
         else:
-            logger.warning(f"Global retrieval issues: {parsed_result.get('errorMessage', 'Unknown error')}")
+            logger.warning(f"TestRunner returned unexpected status: {status}")
             
         return result
         
     except json.JSONDecodeError as e:
         error_response = json.dumps({
-            "status": "error", 
+            "status": "error",
             "error": f"Invalid JSON response from IRIS: {str(e)}",
-            "globalRef": global_ref,
+            "testSpec": test_spec,
             "namespace": namespace
         })
         logger.error(f"JSON decode error: {str(e)}")
@@ -209,47 +2560,62 @@ def get_global(global_ref: str, namespace: str = "HSCUSTOM") -> str:
         error_response = json.dumps({
             "status": "error",
             "error": f"Unexpected error: {str(e)}",
-            "globalRef": global_ref,
+            "testSpec": test_spec,
             "namespace": namespace
         })
         logger.error(f"Unexpected error: {str(e)}")
         return error_response
 
 @mcp.tool()
-def set_global(global_ref: str, value: str, namespace: str = "HSCUSTOM") -> str:
+@instrumented
+async def get_test_results(run_id: int, offset: int = 0, limit: int = 100, status: str = "",
+                           namespace: str = "HSCUSTOM") -> str:
     """
-    Set the value of an IRIS global dynamically.
+    Page through the full per-test results of an earlier test run.
+    
+    execute_unit_tests and submit_unit_tests return only the failures (by default) within a
+    byte limit; every test record of the run is kept in IRIS under its results.runId.
+    The last 20 runs per namespace are kept.
     
     Args:
-        global_ref: The global reference (e.g., "^TempGlobal", "^TempGlobal(1,2)", "^TempGlobal(\"This\",\"That\")")
-        value: The value to set
+        run_id: results.runId from the test run response
+        offset: Number of (matching) records to skip (default: 0)
+        limit: Maximum records to return (default: 100)
+        status: Only tests with this status, e.g. "failed", "error" or "passed" (default: all)
         namespace: Optional IRIS namespace (default: HSCUSTOM)
     
     Returns:
-        JSON string with operation result and verification
+        JSON string with tests (className, method, status, message, duration), records
+        (tests in the run), matched (after the status filter), returned, hasMore and nextOffset
     """
-    logger.info(f"Setting global {global_ref} = '{value}' in {namespace}")
+    logger.info(f"Getting test results for run {run_id} (offset {offset}, limit {limit}) in namespace {namespace}")
     
     try:
-        # Call IRIS backend
-        result = call_iris_sync("ExecuteMCP.Core.Command", "SetGlobal", global_ref, value, namespace)
-        
-        # Parse result to ensure it's valid JSON
-        parsed_result = json.loads(result)
+        result = await call_iris_async(
+            "quick",
+            "ExecuteMCP.Core.TestResults",
+            "Page",
+            10.0,
+            run_id,
+            max(0, offset),
+            max(1, limit),
+            status,
+            namespace
+        )
         
-        # Log success
+        parsed_result = parse_iris_result(result)
         if parsed_result.get("status") == "success":
-            logger.info(f"Global set successfully: {global_ref}")
+            logger.info(f"Returned {parsed_result.get('returned', 0)} of {parsed_result.get('matched', 0)} test results")
         else:
-            logger.warning(f"Global set issues: {parsed_result.get('errorMessage', 'Unknown error')}")
-            
+            logger.warning(f"Test results issues: {parsed_result.get('errorMessage', 'Unknown error')}")
+        
         return result
         
     except json.JSONDecodeError as e:
         error_response = json.dumps({
-            "status": "error", 
+            "status": "error",
             "error": f"Invalid JSON response from IRIS: {str(e)}",
-            "globalRef": global_ref,
+            "runId": run_id,
             "namespace": namespace
         })
         logger.error(f"JSON decode error: {str(e)}")
@@ -259,97 +2625,57 @@ def set_global(global_ref: str, value: str, namespace: str = "HSCUSTOM") -> str:
         error_response = json.dumps({
             "status": "error",
             "error": f"Unexpected error: {str(e)}",
-            "globalRef": global_ref,
+            "runId": run_id,
             "namespace": namespace
         })
         logger.error(f"Unexpected error: {str(e)}")
         return error_response
 
 @mcp.tool()
-def get_system_info() -> str:
+@instrumented
+async def get_test_history(filter: str = "", limit: int = 20, namespace: str = "HSCUSTOM") -> str:
     """
-    Get IRIS system information for connectivity testing.
-    
-    Returns:
-        JSON string with system information
-    """
-    logger.info("Getting IRIS system information")
+    Report the slowest, flakiest and currently failing tests from the recorded run history.
     
-    try:
-        result = call_iris_sync("ExecuteMCP.Core.Command", "GetSystemInfo")
-        logger.info("System info retrieved successfully")
-        return result
-        
-    except Exception as e:
-        error_response = json.dumps({
-            "status": "error",
-            "error": f"System info retrieval failed: {str(e)}",
-            "output": "",
-            "namespace": "N/A"
-        })
-        logger.error(f"System info error: {str(e)}")
-        return error_response
-
-@mcp.tool()
-def execute_classmethod(
-    class_name: str, 
-    method_name: str, 
-    parameters: list = None, 
-    namespace: str = "HSCUSTOM"
-) -> str:
-    """
-    Execute an ObjectScript class method dynamically with support for output parameters.
+    Every test method run by execute_unit_tests (or submit_unit_tests) records its outcome
+    and duration; the history drives the failed-first run order and the shard balancing.
     
     Args:
-        class_name: The ObjectScript class name (e.g., "MyPackage.MyClass")
-        method_name: The method name to invoke
-        parameters: Optional list of parameter objects, each with:
-            - value: The parameter value (required)
-            - isOutput: Whether this is an output/ByRef parameter (default: false)
-            - type: Optional type hint for the parameter
+        filter: Optional class name prefix (e.g., "ExecuteMCP.Test")
+        limit: Maximum tests per list (default: 20)
         namespace: Optional IRIS namespace (default: HSCUSTOM)
     
     Returns:
-        JSON string with method result, output parameters, and any captured output
+        JSON string with slowest (by average duration), flakiest (by outcome flips) and failing
+        lists of {className, method, runs, lastStatus, avgMs, lastMs, flips, flakeRate,
+        failures, lastRun}, and the number of tests with history
     """
-    logger.info(f"Executing class method {class_name}.{method_name} in {namespace}")
+    logger.info(f"Getting test history for '{filter}' in namespace {namespace}")
     
     try:
-        # Default to empty list if no parameters provided
-        if parameters is None:
-            parameters = []
-            
-        # Convert parameters list to JSON string for IRIS
-        parameters_json = json.dumps(parameters)
-        
-        # Call IRIS backend with timeout
-        result = call_iris_with_timeout(
-            "ExecuteMCP.Core.Command", 
-            "ExecuteClassMethod", 
-            30.0,  # 30 second timeout for class methods
-            class_name, 
-            method_name, 
-            parameters_json, 
+        result = await call_iris_async(
+            "quick",
+            "ExecuteMCP.Core.TestHistory",
+            "Report",
+            10.0,
+            filter,
+            max(1, limit),
             namespace
         )
         
-        # Parse result to ensure it's valid JSON
-        parsed_result = json.loads(result)
-        
-        # Log success
+        parsed_result = parse_iris_result(result)
         if parsed_result.get("status") == "success":
-            logger.info(f"Class method executed successfully: {class_name}.{method_name}")
+            logger.info(f"Test history covers {parsed_result.get('tests', 0)} tests")
         else:
-            logger.warning(f"Class method execution issues: {parsed_result.get('errorMessage', 'Unknown error')}")
-            
+            logger.warning(f"Test history issues: {parsed_result.get('errorMessage', 'Unknown error')}")
+        
         return result
         
     except json.JSONDecodeError as e:
         error_response = json.dumps({
-            "status": "error", 
+            "status": "error",
             "error": f"Invalid JSON response from IRIS: {str(e)}",
-            "className": class_name,
-            "methodName": method_name,
+            "filter": filter,
             "namespace": namespace
         })
         logger.error(f"JSON decode error: {str(e)}")
@@ -359,78 +2685,104 @@ def execute_classmethod(
         error_response = json.dumps({
             "status": "error",
             "error": f"Unexpected error: {str(e)}",
-            "className": class_name,
-            "methodName": method_name,
+            "filter": filter,
             "namespace": namespace
         })
         logger.error(f"Unexpected error: {str(e)}")
         return error_response
 
-
 # =====================================================================================
-# CUSTOM TESTRUNNER TOOL - RENAMED FROM run_custom_testrunner TO execute_unit_tests
+# TEST DISCOVERY - MANIFEST CACHE
 # =====================================================================================
 
+# Seconds a test manifest is served from memory (0 disables the cache). IRIS keeps its
+# own per-class discovery index, so this only saves the round trip for repeated lookups.
+MANIFEST_CACHE_TTL = float(os.getenv('IRIS_MANIFEST_CACHE_TTL', '60'))
+
+# (namespace, package, filter) -> (stored at, manifest JSON)
+_manifest_cache = {}
+_manifest_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+# Bumped by every invalidation, so a discovery that overlapped a compile is neither
+# cached nor joined by later discoveries
+_manifest_cache_generation = 0
+
+
+def invalidate_manifest_cache():
+    """Drop all cached manifests; called whenever classes may have been recompiled."""
+    global _manifest_cache_generation
+    _manifest_cache_generation += 1
+    if _manifest_cache:
+        _manifest_cache.clear()
+        _manifest_cache_stats["invalidations"] += 1
+
+
+def get_manifest_cache_stats() -> dict:
+    """Manifest cache counters for get_server_metrics."""
+    return {"ttl": MANIFEST_CACHE_TTL, "entries": len(_manifest_cache), **_manifest_cache_stats}
+
+
 @mcp.tool()
-def execute_unit_tests(test_spec: str, namespace: str = "HSCUSTOM") -> str:
+@instrumented
+async def discover_unit_tests(package: str, filter: str = "", namespace: str = "HSCUSTOM") -> str:
     """
-    Execute unit tests using the custom ExecuteMCP.TestRunner.
-    
-    Uses DirectTestRunner which bypasses complex %UnitTest.Manager infrastructure
-    to avoid timeout issues while maintaining assertion compatibility.
+    List the test classes and test methods in a package without running them.
     
     Args:
-        test_spec: Test specification (package, class, or class:method)
-                   Examples:
-                   - "ExecuteMCP.Test" (run all tests in package)
-                   - "ExecuteMCP.Test.SampleUnitTest" (run all methods in class)
-                   - "ExecuteMCP.Test.SampleUnitTest:TestAddition" (run specific method)
+        package: Package to search (e.g., "ExecuteMCP.Test"), including subpackages
+        filter: Optional filter, "class:<text>" and/or "method:<text>" substring matches
         namespace: Optional IRIS namespace (default: HSCUSTOM)
     
     Returns:
-        JSON string with complete test results including:
-        - summary: Overall test statistics (passed, failed, errors, skipped)
-        - tests: Detailed results for each test method
-        - executionTime: Total time taken
-        - status: Overall execution status
+        JSON string with the test manifest:
+        - classes: [{className, methods, methodCount}]
+        - totalClasses / totalTests
+        - discoveryTimeMs and discoveryIndex (index entries reused / rebuilt) on the IRIS side
+        - cached / cacheAgeMs when served from the server-side manifest cache
     """
-    logger.info(f"Running DirectTestRunner for: {test_spec} in namespace {namespace}")
+    logger.info(f"Discovering unit tests in {package} (filter '{filter}') in namespace {namespace}")
     
+    key = (namespace, package, filter)
+    cached = _manifest_cache.get(key)
+    if cached and time.monotonic() - cached[0] < MANIFEST_CACHE_TTL:
+        _manifest_cache_stats["hits"] += 1
+        manifest = json.loads(cached[1])
+        manifest["cached"] = True
+        manifest["cacheAgeMs"] = round((time.monotonic() - cached[0]) * 1000)
+        return json.dumps(manifest)
+    _manifest_cache_stats["misses"] += 1
+    
+    generation = _manifest_cache_generation
     try:
-        # Call DirectTestRunner.RunTests with the test spec directly
-        # DirectTestRunner handles all the complex object creation internally
-        logger.info("Calling DirectTestRunner.RunTests")
-        result = call_iris_with_timeout(
-            "ExecuteMCP.Core.DirectTestRunner",
-            "RunTests",  # Correct method name
-            30.0,  # 30 second timeout for test execution
-            test_spec  # DirectTestRunner.RunTests only takes the test spec parameter
+        result = await coalesce_read(
+            "discover_unit_tests",
+            key + (generation,),
+            lambda: call_iris_async(
+                "quick",
+                "ExecuteMCP.TestRunner.Discovery",
+                "BuildTestManifest",
+                30.0,  # 30 second timeout for a cold index on a large namespace
+                package,
+                filter,
+                namespace
+            )
         )
         
-        # Parse result to ensure it's valid JSON
-        parsed_result = json.loads(result)
-        
-        # Log test execution status
-        status = parsed_result.get("status", "unknown")
-        if status == "success":
-            summary = parsed_result.get("summary", {})
-            total = summary.get("total", 0)
-            passed = summary.get("passed", 0)
-            failed = summary.get("failed", 0)
-            errors = summary.get("errors", 0)
-            logger.info(f"TestRunner completed: {passed}/{total} passed, {failed} failed, {errors} errors")
-        elif status == "error":
-            logger.error(f"TestRunner execution failed: {parsed_result.get('error', 'Unknown error')}")
+        parsed_result = parse_iris_result(result)
+        if parsed_result.get("success"):
+            logger.info(f"Discovered {parsed_result.get('totalTests', 0)} tests in {parsed_result.get('totalClasses', 0)} classes "
+                        f"in {parsed_result.get('discoveryTimeMs')}ms")
+            if MANIFEST_CACHE_TTL > 0 and generation == _manifest_cache_generation:
+                _manifest_cache[key] = (time.monotonic(), result)
         else:
-            logger.warning(f"TestRunner returned unexpected status: {status}")
-            
+            logger.error(f"Test discovery failed: {parsed_result.get('error', 'Unknown error')}")
+        
         return result
         
     except json.JSONDecodeError as e:
         error_response = json.dumps({
             "status": "error",
             "error": f"Invalid JSON response from IRIS: {str(e)}",
-            "testSpec": test_spec,
+            "package": package,
             "namespace": namespace
         })
         logger.error(f"JSON decode error: {str(e)}")
@@ -440,18 +2792,21 @@ def execute_unit_tests(test_spec: str, namespace: str = "HSCUSTOM") -> str:
         error_response = json.dumps({
             "status": "error",
             "error": f"Unexpected error: {str(e)}",
-            "testSpec": test_spec,
+            "package": package,
             "namespace": namespace
         })
         logger.error(f"Unexpected error: {str(e)}")
         return error_response
 
+
 # =====================================================================================
 # OBJECTSCRIPT COMPILATION TOOLS
 # =====================================================================================
 
 @mcp.tool()
-def compile_objectscript_class(class_names: str, qspec: str = "bckry", namespace: str = "HSCUSTOM") -> str:
+@instrumented
+async def compile_objectscript_class(class_names: str, qspec: str = "bckry", namespace: str = "HSCUSTOM",
+                                     incremental: bool = False, workers: int = 1) -> str:
     """
     Compile one or more ObjectScript classes in IRIS.
     
@@ -467,25 +2822,40 @@ def compile_objectscript_class(class_names: str, qspec: str = "bckry", namespace
                r = Recursive compile
                y = Display compilation information
         namespace: Target namespace (default: HSCUSTOM)
+        incremental: Compile only classes changed since their last successful compile,
+                     plus the classes that depend on them (default: False)
+        workers: Compile with this many IRIS worker jobs, one dependency layer at a
+                 time (default: 1, single process)
     
     Returns:
-        JSON string with compilation results including any errors
+        JSON string with compilation results including any errors and the compileMarker
+        to pass as since_marker to execute_unit_tests(affected=True); incremental
+        compiles add changedItems, dirtyItems (dependents) and skippedItems (up to date);
+        parallel compiles add layers and per-chunk timings and errors (chunks)
     """
-    logger.info(f"Compiling classes: {class_names} with qspec: {qspec} in namespace: {namespace}")
+    logger.info(f"Compiling classes: {class_names} with qspec: {qspec} in namespace: {namespace}"
+                f"{' (incremental)' if incremental else ''}")
     
     try:
         # Call IRIS backend with timeout for compilation
-        result = call_iris_with_timeout(
+        result = await call_iris_async(
+            "compile",
             "ExecuteMCP.Core.Compile",
             "CompileClasses",
             60.0,  # 60 second timeout for compilation
             class_names,
             qspec,
-            namespace
+            namespace,
+            1 if incremental else 0,
+            max(1, workers)
         )
         
+        # Recompiled classes may add or remove tests, and compiling runs generator code
+        invalidate_manifest_cache()
+        invalidate_cached_globals(namespace)
+        
         # Parse result to ensure it's valid JSON
-        parsed_result = json.loads(result)
+        parsed_result = parse_iris_result(result)
         
         # Log compilation status
         status = parsed_result.get("status", "unknown")
@@ -519,7 +2889,9 @@ def compile_objectscript_class(class_names: str, qspec: str = "bckry", namespace
         return error_response
 
 @mcp.tool()
-def compile_objectscript_package(package_name: str, qspec: str = "bckry", namespace: str = "HSCUSTOM") -> str:
+@instrumented
+async def compile_objectscript_package(package_name: str, qspec: str = "bckry", namespace: str = "HSCUSTOM",
+                                     incremental: bool = False, workers: int = 1) -> str:
     """
     Compile all classes in an ObjectScript package.
     
@@ -532,25 +2904,40 @@ def compile_objectscript_package(package_name: str, qspec: str = "bckry", namesp
                r = Recursive compile
                y = Display compilation information
         namespace: Target namespace (default: HSCUSTOM)
+        incremental: Compile only classes changed since their last successful compile,
+                     plus the classes that depend on them (default: False)
+        workers: Compile with this many IRIS worker jobs, one dependency layer at a
+                 time (default: 1, single process)
     
     Returns:
-        JSON string with compilation results including any errors
+        JSON string with compilation results including any errors and the compileMarker
+        to pass as since_marker to execute_unit_tests(affected=True); incremental
+        compiles add changedItems, dirtyItems (dependents) and skippedItems (up to date);
+        parallel compiles add layers and per-chunk timings and errors (chunks)
     """
-    logger.info(f"Compiling package: {package_name} with qspec: {qspec} in namespace: {namespace}")
+    logger.info(f"Compiling package: {package_name} with qspec: {qspec} in namespace: {namespace}"
+                f"{' (incremental)' if incremental else ''}")
     
     try:
         # Call IRIS backend with longer timeout for package compilation
-        result = call_iris_with_timeout(
+        result = await call_iris_async(
+            "compile",
             "ExecuteMCP.Core.Compile",
             "CompilePackage",
             120.0,  # 2 minute timeout for package compilation
             package_name,
             qspec,
-            namespace
+            namespace,
+            1 if incremental else 0,
+            max(1, workers)
         )
         
+        # Recompiled classes may add or remove tests, and compiling runs generator code
+        invalidate_manifest_cache()
+        invalidate_cached_globals(namespace)
+        
         # Parse result to ensure it's valid JSON
-        parsed_result = json.loads(result)
+        parsed_result = parse_iris_result(result)
         
         # Log compilation status
         status = parsed_result.get("status", "unknown")
@@ -583,6 +2970,302 @@ def compile_objectscript_package(package_name: str, qspec: str = "bckry", namesp
         logger.error(f"Unexpected error: {str(e)}")
         return error_response
 
+# =====================================================================================
+# BACKGROUND JOB TOOLS - SUBMIT / POLL / CANCEL
+# =====================================================================================
+
+# Seconds a finished background job stays pollable before IRIS removes it
+JOB_TTL = int(os.getenv('IRIS_JOB_TTL', '3600'))
+
+
+async def submit_job(kind: str, args: dict, namespace: str) -> str:
+    """Submit a background job through ExecuteMCP.Core.AsyncJob and return its JSON response."""
+    logger.info(f"Submitting {kind} job in namespace {namespace}: {args}")
+    
+    if kind != "tests":
+        # The job will recompile classes, which may add or remove tests
+        invalidate_manifest_cache()
+    # The job runs arbitrary code in the namespace
+    invalidate_cached_globals(namespace)
+    
+    try:
+        result = await call_iris_async(
+            "quick",
+            "ExecuteMCP.Core.AsyncJob",
+            "Submit",
+            10.0,  # Submit only records the job and starts the process
+            kind,
+            json.dumps(args),
+            namespace,
+            JOB_TTL
+        )
+        
+        parsed_result = parse_iris_result(result)
+        if parsed_result.get("status") == "queued":
+            logger.info(f"Job {parsed_result.get('jobID')} queued as process {parsed_result.get('pid')}")
+        else:
+            logger.error(f"Job submission failed: {parsed_result.get('errorMessage', 'Unknown error')}")
+        
+        return result
+        
+    except json.JSONDecodeError as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Invalid JSON response from IRIS: {str(e)}",
+            "kind": kind,
+            "namespace": namespace
+        })
+        logger.error(f"JSON decode error: {str(e)}")
+        return error_response
+        
+    except Exception as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Unexpected error: {str(e)}",
+            "kind": kind,
+            "namespace": namespace
+        })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
+
+@mcp.tool()
+@instrumented
+async def submit_unit_tests(test_spec: str, namespace: str = "HSCUSTOM", workers: int = 1,
+                            affected: bool = False, since_marker: int = 0, isolate: bool = False,
+                            detail: str = "failures", max_bytes: int = TEST_RESULTS_MAX_BYTES) -> str:
+    """
+    Start a unit test run in an IRIS background job and return its job ID immediately.
+    
+    Use for suites that take longer than execute_unit_tests allows; follow up with
+    poll_job to collect per-test progress and the final result.
+    
+    Args:
+        test_spec: Test specification (package, class, or class:method), as for execute_unit_tests
+        namespace: Optional IRIS namespace (default: HSCUSTOM)
+        workers: Number of IRIS background jobs to spread test classes across (default: 1)
+        affected: Run only the tests affected by recent compiles, as for execute_unit_tests
+        since_marker: compileMarker to count changes from (default: 0, the last compile)
+        isolate: One test case instance per method instead of per class (default: False)
+        detail: Tests listed in the job result - "failures" (default), "all" or "none"
+        max_bytes: Cap on the test records in the job result (0 = no cap)
+    
+    Returns:
+        JSON string with jobID, pid and status "queued"
+    """
+    if detail not in TEST_RESULT_DETAILS:
+        return json.dumps({
+            "status": "error",
+            "error": f"Invalid detail '{detail}' (expected one of: {', '.join(TEST_RESULT_DETAILS)})"
+        })
+    args = {"testSpec": test_spec, "workers": max(1, workers), "affected": affected,
+            "sinceMarker": max(0, since_marker), "isolate": isolate,
+            "detail": detail, "maxBytes": max(0, max_bytes)}
+    return await submit_job("tests", args, namespace)
+
+
+@mcp.tool()
+@instrumented
+async def submit_compile_classes(class_names: str, qspec: str = "bckry", namespace: str = "HSCUSTOM",
+                                 incremental: bool = False, workers: int = 1) -> str:
+    """
+    Start compiling one or more ObjectScript classes in an IRIS background job.
+    
+    Args:
+        class_names: Class name(s) to compile, as for compile_objectscript_class
+        qspec: Compilation flags (default: "bckry")
+        namespace: Target namespace (default: HSCUSTOM)
+        incremental: Compile only changed classes and their dependents (default: False)
+        workers: Compile with this many IRIS worker jobs by dependency layer (default: 1)
+    
+    Returns:
+        JSON string with jobID, pid and status "queued"; poll_job returns the compile result
+    """
+    args = {"classList": class_names, "qspec": qspec, "incremental": incremental, "workers": max(1, workers)}
+    return await submit_job("compileClasses", args, namespace)
+
+
+@mcp.tool()
+@instrumented
+async def submit_compile_package(package_name: str, qspec: str = "bckry", namespace: str = "HSCUSTOM",
+                                 incremental: bool = False, workers: int = 1) -> str:
+    """
+    Start compiling an ObjectScript package in an IRIS background job.
+    
+    Args:
+        package_name: Package name to compile, as for compile_objectscript_package
+        qspec: Compilation flags (default: "bckry")
+        namespace: Target namespace (default: HSCUSTOM)
+        incremental: Compile only changed classes and their dependents (default: False)
+        workers: Compile with this many IRIS worker jobs by dependency layer (default: 1)
+    
+    Returns:
+        JSON string with jobID, pid and status "queued"; poll_job returns the compile result
+    """
+    args = {"packageName": package_name, "qspec": qspec, "incremental": incremental, "workers": max(1, workers)}
+    return await submit_job("compilePackage", args, namespace)
+
+
+@mcp.tool()
+@instrumented
+async def poll_job(job_id: int, since: int = 0) -> str:
+    """
+    Get the status, new progress records and (when finished) the result of a background job.
+    
+    Args:
+        job_id: Job ID returned by a submit_* tool
+        since: Number of progress records already seen; only later records are returned
+               (pass the previous response's progressCount)
+    
+    Returns:
+        JSON string with:
+        - status: queued, running, completed, failed or cancelled
+        - progress: progress records after `since` (per test for test runs)
+        - progressCount: total progress records so far
+        - elapsedMs: time since submission (until finished)
+        - result / error: the job's result once completed, or its error
+    """
+    logger.info(f"Polling job {job_id} since {since}")
+    
+    try:
+        result = await call_iris_async(
+            "quick",
+            "ExecuteMCP.Core.AsyncJob",
+            "Poll",
+            10.0,
+            str(job_id),
+            since
+        )
+        
+        parsed_result = parse_iris_result(result)
+        logger.info(f"Job {job_id} status: {parsed_result.get('status', 'unknown')}")
+        if parsed_result.get("kind", "tests") != "tests" and parsed_result.get("status") == "completed":
+            # Manifests cached while the compile ran may be stale
+            invalidate_manifest_cache()
+        if parsed_result.get("status") in ("running", "completed", "failed", "cancelled"):
+            # Globals cached while the job ran may be stale
+            invalidate_cached_globals(parsed_result.get("namespace"))
+        return result
+        
+    except json.JSONDecodeError as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Invalid JSON response from IRIS: {str(e)}",
+            "jobID": job_id
+        })
+        logger.error(f"JSON decode error: {str(e)}")
+        return error_response
+        
+    except Exception as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Unexpected error: {str(e)}",
+            "jobID": job_id
+        })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
+
+@mcp.tool()
+@instrumented
+async def cancel_job(job_id: int) -> str:
+    """
+    Cancel a queued or running background job, terminating its IRIS process.
+    
+    Args:
+        job_id: Job ID returned by a submit_* tool
+    
+    Returns:
+        JSON string with status "cancelled" (or the final status if the job already finished)
+    """
+    logger.info(f"Cancelling job {job_id}")
+    
+    try:
+        result = await call_iris_async(
+            "quick",
+            "ExecuteMCP.Core.AsyncJob",
+            "Cancel",
+            10.0,
+            str(job_id)
+        )
+        
+        parsed_result = parse_iris_result(result)
+        logger.info(f"Job {job_id} cancel result: {parsed_result.get('status', 'unknown')}")
+        return result
+        
+    except json.JSONDecodeError as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Invalid JSON response from IRIS: {str(e)}",
+            "jobID": job_id
+        })
+        logger.error(f"JSON decode error: {str(e)}")
+        return error_response
+        
+    except Exception as e:
+        error_response = json.dumps({
+            "status": "error",
+            "error": f"Unexpected error: {str(e)}",
+            "jobID": job_id
+        })
+        logger.error(f"Unexpected error: {str(e)}")
+        return error_response
+
+# =====================================================================================
+# SERVER METRICS
+# =====================================================================================
+
+@mcp.tool()
+@instrumented
+async def get_server_metrics() -> str:
+    """
+    Get MCP server-side metrics for monitoring and alerting.
+    
+    Returns:
+        JSON string with:
+        - concurrency: limit / active / waiting calls per tool class (quick, execute, compile, test)
+        - calls: timeout counters (timedOut, timedOutQueued, terminated, terminateFailures,
+          cancelled, leaked, leakedActive) and the calls currently in flight
+        - coalescing: identical concurrent reads that waited for an in-flight call (coalesced,
+          also per tool) instead of calling IRIS, calls that led a flight (leaders), and
+          followers that had to call IRIS themselves after their leader was cancelled (retried)
+        - manifestCache: discover_unit_tests cache entries and hit / miss / invalidation counters
+        - nativeGlobals: get_global / set_global calls served by the Native API (native) and
+          sent to ObjectScript instead (fallbackUnparsed, fallbackError), and native sets that
+          failed after reaching IRIS (errorAfterSend)
+        - resultCache: opt-in get_system_info / get_global cache entries and hit / miss /
+          store / eviction / expiration / invalidation counters
+        - sql: SQL cursor counters (opened, exhausted, closed, expired, broken, rejected) and
+          the cursors currently open with the IRIS process pinned to each
+        - tools: per tool calls / errors and latency (count, meanMs, p50Ms, p95Ms, p99Ms, maxMs)
+          for the phases total, queue (concurrency slot), checkout (pool), rpc (IRIS call),
+          parse (response JSON) and coalesced (waiting for an identical in-flight read)
+        - pools: connection pool statistics per host/port/namespace/user:
+            - size / idle / inUse: current pool occupancy
+            - checkouts, waits, creates, evictions, discards, reconnects, timeouts: cumulative counters
+            - resets / rollbacks: processes cleaned up after running user code, and how many
+              of them had a transaction left open
+    """
+    logger.info("Getting server metrics")
+    
+    with _connection_pools_lock:
+        pools = list(_connection_pools.values())
+    
+    return json.dumps({
+        "status": "success",
+        "concurrency": get_concurrency_stats(),
+        "calls": get_call_stats(),
+        "coalescing": get_coalesce_stats(),
+        "manifestCache": get_manifest_cache_stats(),
+        "nativeGlobals": get_native_global_stats(),
+        "resultCache": get_result_cache_stats(),
+        "sql": get_sql_stats(),
+        "tools": get_tool_metrics(),
+        "poolEnabled": POOL_ENABLED,
+        "pools": [pool.stats() for pool in pools],
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+    })
+
 if __name__ == "__main__":
     logger.info("Starting IRIS Execute FastMCP Server")
     logger.info(f"IRIS Available: {IRIS_AVAILABLE}")
@@ -594,6 +3277,8 @@ if __name__ == "__main__":
             test_parsed = json.loads(test_result)
             if test_parsed.get("status") == "success":
                 logger.info("✅ IRIS connectivity test passed")
+                if POOL_ENABLED:
+                    get_connection_pool().fill()
             else:
                 logger.warning(f"⚠️ IRIS connectivity test failed: {test_parsed.get('error')}")
         except Exception as e: